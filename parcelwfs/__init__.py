@@ -1,4 +1,4 @@
-from .parcelwfs import ParcelWFS, GSAAPropertyMapping
+from .parcelwfs import ParcelWFS, GSAAPropertyMapping, ParcelType
 from .parcels import Parcel
 
-__all__ = ["ParcelWFS", "GSAAPropertyMapping", "Parcel"]
+__all__ = ["ParcelWFS", "GSAAPropertyMapping", "ParcelType", "Parcel"]
@@ -12,6 +12,8 @@ MergingCriteria : StrEnum
     Enumeration of criteria for merging parcels.
 Parcel : class
     Represents a field parcel with geometry and metadata.
+IncrementalTargets : class
+    Merge targets with a lazily built, incrementally invalidated spatial index.
 
 Functions
 ---------
@@ -24,7 +26,10 @@ Author: Olli Nevalainen, Finnish Meteorological Institute
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 import shapely
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import parcelwfs
@@ -46,6 +51,8 @@ logger = logging.getLogger(__name__)
 
 
 MERGED_GEOM_PROPERTY = "merged_geometries"
+# Minimum number of candidate-target pairs per thread when scoring merges
+PARALLEL_MIN_PAIRS = 10000
 
 
 class MergingCriteria(StrEnum):
@@ -97,6 +104,17 @@ class Parcel:
     >>> parcel.get_parcel_geometry()
     """
 
+    __slots__ = (
+        "parcel_id",
+        "wfs",
+        "year",
+        "lpis_parcel_id",
+        "gsaa_parcel_names",
+        "gsaa_parcel_ids",
+        "geometry",
+        "crs_int",
+    )
+
     def __init__(
         self,
         parcel_id: str,
@@ -108,15 +126,13 @@ class Parcel:
 
         self.wfs = self.validate_parcelwfs_input(parcelwfs_id, wfs)
 
-        self.year = int(parcel_id.split(PARCEL_SEP)[0])
-        lpis_parcel, gsaa_parcel_names = self.extract_lpis_and_gsaa_from_parcel_id(
-            parcel_id
-        )
-        self.lpis_parcel_id = lpis_parcel
-        self.gsaa_parcel_names = gsaa_parcel_names
+        parcel_id_parts = parcel_id.split(PARCEL_SEP)
+        self.year = int(parcel_id_parts[0])
+        self.lpis_parcel_id = parcel_id_parts[1]
+        self.gsaa_parcel_names = parcel_id_parts[2:]
+        gsaa_prefix = self.lpis_parcel_id + PARCEL_SEP
         self.gsaa_parcel_ids = [
-            f"{self.lpis_parcel_id}{PARCEL_SEP}{parcel_number}"
-            for parcel_number in self.gsaa_parcel_names
+            gsaa_prefix + parcel_number for parcel_number in self.gsaa_parcel_names
         ]
         self.geometry = None
         self.crs_int = crs_int
@@ -178,9 +194,11 @@ class Parcel:
             List of Parcel instances created from the GeoDataFrame rows.
         """
         parcels = []
-        for _, gsaa_parcel in gdf.iterrows():
-            parcel = cls(gsaa_parcel.parcel_id, wfs=wfs)
-            parcel.geometry = gsaa_parcel.geometry
+        for parcel_id, geometry in zip(
+            gdf["parcel_id"].to_numpy(), gdf.geometry.values
+        ):
+            parcel = cls(parcel_id, wfs=wfs)
+            parcel.geometry = geometry
             parcels.append(parcel)
         return parcels
 
@@ -289,31 +307,25 @@ class Parcel:
             Tuple of (lpis_parcel_id, list of gsaa_parcel_names).
         """
         parcels_str = parcel_id.split(PARCEL_SEP)
-        lpis_parcel = parcels_str[1]
-        gsaa_parcel_names = parcels_str[2:] if len(parcels_str) > 1 else []
-        if isinstance(gsaa_parcel_names, str):
-            gsaa_parcel_names = [gsaa_parcel_names]
-        return lpis_parcel, gsaa_parcel_names
+        return parcels_str[1], parcels_str[2:]
 
     def get_parcel_geometry(self):
         """
         Fetch and set the parcel geometry from the WFS service.
 
         For LPIS-only parcels, retrieves the LPIS geometry. For GSAA parcels,
-        retrieves all GSAA parcel geometries and unions them into a single geometry.
+        retrieves all GSAA parcel geometries with a single request and unions them
+        into a single geometry.
         """
         if not self.gsaa_parcel_ids:
             self.geometry = self.wfs.get_lpis_parcel_by_id(
                 self.lpis_parcel_id, self.year, output_crs=self.crs_int
             ).geometry
         else:
-            geometries = []
-            for gsaa_parcel_id in self.gsaa_parcel_ids:
-                gsaa_parcel = self.wfs.get_gsaa_parcel_by_id(
-                    gsaa_parcel_id, year=self.year, output_crs=self.crs_int
-                )
-                geometries.append(gsaa_parcel.geometry)
-            self.geometry = shapely.union_all(geometries)
+            gsaa_parcels = self.wfs.get_gsaa_parcels_by_ids(
+                self.gsaa_parcel_ids, year=self.year, output_crs=self.crs_int
+            )
+            self.geometry = shapely.union_all(np.asarray(gsaa_parcels.geometry.values))
 
     @staticmethod
     def add_parcel_id(
@@ -347,49 +359,58 @@ class Parcel:
         ValueError
             If gdf_original is None when merged geometries are present.
         """
-        parcel_ids = []
         gsaa_properties = wfs.gsaa_properties
+        year_col = gsaa_properties.year
+        lpis_col = gsaa_properties.lpis_parcel_id
+        name_col = gsaa_properties.gsaa_parcel_name
+
+        parcel_names = gdf_merged[name_col].astype(str).to_numpy(dtype=object)
+        merged_parcel_idxs = (
+            gdf_merged[MERGED_GEOM_PROPERTY].to_numpy()
+            if MERGED_GEOM_PROPERTY in gdf_merged.columns
+            else np.full(len(gdf_merged), None)
+        )
+        is_merged = np.array(
+            [isinstance(idxs, list) and len(idxs) > 0 for idxs in merged_parcel_idxs],
+            dtype=bool,
+        )
 
-        for _, gsaa_parcel in gdf_merged.iterrows():
-            merged_parcel_idxs = getattr(gsaa_parcel, MERGED_GEOM_PROPERTY, None)
-            lpis_parcel_id = getattr(gsaa_parcel, gsaa_properties.lpis_parcel_id)
-            year = getattr(gsaa_parcel, gsaa_properties.year)
-
-            if not merged_parcel_idxs:
-                parcel_name = getattr(gsaa_parcel, gsaa_properties.gsaa_parcel_name)
-                parcel_id = (
-                    f"{year}{PARCEL_SEP}{lpis_parcel_id}{PARCEL_SEP}{parcel_name}"
-                )
-            else:
-                # Check that the original gdf is given
-                if gdf_original is None:
-                    err_msg = (
-                        "Original GeoDataFrame is needed to get the original parcel numbers"
-                        "for merged parcels."
-                    )
-                    logger.error(err_msg)
-                    raise ValueError(err_msg)
-                parcel_names = list(
-                    gdf_original.loc[
-                        merged_parcel_idxs,
-                        gsaa_properties.gsaa_parcel_name,
-                    ].astype("string")
-                )
-                merged_ids = PARCEL_SEP.join(parcel_names)
-                parcel_id = (
-                    f"{year}{PARCEL_SEP}{lpis_parcel_id}{PARCEL_SEP}{merged_ids}"
+        if is_merged.any():
+            # Check that the original gdf is given
+            if gdf_original is None:
+                err_msg = (
+                    "Original GeoDataFrame is needed to get the original parcel numbers"
+                    "for merged parcels."
                 )
-            parcel_ids.append(parcel_id)
-
-        gdf_merged.loc[:, "parcel_id"] = parcel_ids
+                logger.error(err_msg)
+                raise ValueError(err_msg)
+            # Look up the names of all merged originals at once by position
+            merged_idxs = merged_parcel_idxs[is_merged]
+            original_pos = gdf_original.index.get_indexer(np.concatenate(merged_idxs))
+            original_names = gdf_original[name_col].to_numpy()[original_pos]
+            name_groups = np.split(
+                original_names.astype(str),
+                np.cumsum([len(i) for i in merged_idxs])[:-1],
+            )
+            parcel_names[is_merged] = [PARCEL_SEP.join(names) for names in name_groups]
+
+        parcel_ids = (
+            gdf_merged[year_col].astype(str)
+            + PARCEL_SEP
+            + gdf_merged[lpis_col].astype(str)
+            + PARCEL_SEP
+            + parcel_names
+        )
+        gdf_merged["parcel_id"] = parcel_ids
         return gdf_merged
 
 
 def keep_equal_values(x):
     """
-    Return the mode value if all values are equal, otherwise None.
+    Return the common value if all values are equal, otherwise None.
 
-    Used as an aggregation function when dissolving geometries.
+    Used as an aggregation function when dissolving geometries. Missing values
+    are ignored, as with pandas nunique.
 
     Parameters
     ----------
@@ -401,7 +422,12 @@ def keep_equal_values(x):
     value or None
         The common value if all values are equal, otherwise None.
     """
-    return x.mode()[0] if x.nunique() == 1 else None
+    values = x.to_numpy()
+    values = values[~pd.isna(values)]
+    if len(values) == 0:
+        return None
+    first = values[0]
+    return first if (values == first).all() else None
 
 
 def merge_to_single_parts(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -421,11 +447,146 @@ def merge_to_single_parts(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     gpd.GeoDataFrame
         GeoDataFrame with dissolved and exploded single-part geometries.
     """
-    gdf_union = gdf.dissolve(aggfunc=keep_equal_values)
+    # Same as gdf.dissolve(aggfunc=keep_equal_values) without the groupby machinery
+    # for what is always a single group
+    geometry_name = gdf.geometry.name
+    attributes = {
+        column: [keep_equal_values(gdf[column])]
+        for column in gdf.columns
+        if column != geometry_name
+    }
+    attributes[geometry_name] = [shapely.union_all(np.asarray(gdf.geometry.values))]
+    gdf_union = gpd.GeoDataFrame(attributes, geometry=geometry_name, crs=gdf.crs)
     gdf_single_parts = gdf_union.explode(index_parts=False).reset_index(drop=True)
     return gdf_single_parts
 
 
+def replace_geometries(
+    gdf: gpd.GeoDataFrame, positions: np.ndarray, geometries: np.ndarray
+) -> gpd.GeoDataFrame:
+    """
+    Return a shallow copy of gdf with geometries replaced at given positions.
+
+    Only the geometry column is reallocated, other columns are shared with gdf.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        GeoDataFrame whose geometries are replaced.
+    positions : np.ndarray
+        Integer positions of the rows to update.
+    geometries : np.ndarray
+        New geometries for the rows at positions.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Copy of gdf with updated geometries.
+    """
+    new_geometries = np.array(gdf.geometry.values, dtype=object)
+    new_geometries[positions] = geometries
+    gdf_updated = gdf.copy(deep=False)
+    gdf_updated[gdf.geometry.name] = gpd.GeoSeries(
+        new_geometries, index=gdf.index, crs=gdf.crs
+    )
+    return gdf_updated
+
+
+class IncrementalTargets:
+    """
+    Merge targets with a lazily built and incrementally invalidated spatial index.
+
+    The STRtree is built on the first query. Geometries replaced after that are
+    marked dirty: tree hits for dirty targets are discarded and dirty targets are
+    tested directly with a vectorized predicate instead. The tree is rebuilt only
+    when the number of dirty targets grows beyond the square root of the number
+    of targets. Fewer than ``min_tree_size`` targets are tested directly without
+    building a tree at all.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Target parcels.
+
+    Attributes
+    ----------
+    gdf : gpd.GeoDataFrame
+        Target parcels with the latest geometries.
+    tree : shapely.STRtree or None
+        Spatial index of the target geometries, None until first needed.
+    dirty_positions : set
+        Positions of targets whose geometries have changed since the tree was built.
+    min_tree_size : int
+        Smallest number of targets for which a spatial index is used.
+    """
+
+    min_tree_size = 32
+
+    def __init__(self, gdf: gpd.GeoDataFrame):
+        self.gdf = gdf
+        self.tree = None
+        self.dirty_positions = set()
+
+    def query(self, geometries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the targets intersecting the given geometries.
+
+        Parameters
+        ----------
+        geometries : np.ndarray
+            Geometries to query.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Positions in geometries and positions of the intersecting targets,
+            sorted by geometry position and then target position.
+        """
+        if len(self.gdf) < self.min_tree_size:
+            # np.nonzero returns the hits already sorted by geometry and target
+            hits = shapely.intersects(
+                geometries[:, np.newaxis],
+                np.asarray(self.gdf.geometry.values)[np.newaxis, :],
+            )
+            return np.nonzero(hits)
+        if self.tree is None:
+            self.tree = shapely.STRtree(np.asarray(self.gdf.geometry.values))
+            self.dirty_positions = set()
+        geometry_pos, target_pos = self.tree.query(geometries, predicate="intersects")
+
+        if self.dirty_positions:
+            dirty = np.fromiter(self.dirty_positions, dtype=target_pos.dtype)
+            is_clean = ~np.isin(target_pos, dirty)
+            geometry_pos, target_pos = geometry_pos[is_clean], target_pos[is_clean]
+            dirty_geoms = np.asarray(self.gdf.geometry.values)[dirty]
+            dirty_hits = shapely.intersects(
+                geometries[:, np.newaxis], dirty_geoms[np.newaxis, :]
+            )
+            dirty_geometry_pos, dirty_idx = np.nonzero(dirty_hits)
+            geometry_pos = np.concatenate([geometry_pos, dirty_geometry_pos])
+            target_pos = np.concatenate([target_pos, dirty[dirty_idx]])
+
+        order = np.lexsort((target_pos, geometry_pos))
+        return geometry_pos[order], target_pos[order]
+
+    def update(self, positions: np.ndarray, geometries: np.ndarray):
+        """
+        Replace target geometries at the given positions.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            Integer positions of the targets to update.
+        geometries : np.ndarray
+            New geometries for the targets.
+        """
+        self.gdf = replace_geometries(self.gdf, positions, geometries)
+        if self.tree is not None:
+            self.dirty_positions.update(np.atleast_1d(positions).tolist())
+            if len(self.dirty_positions) > np.sqrt(len(self.gdf)):
+                self.tree = None
+
+
 def merge_by_shortest_boundary(
     candidate: pd.Series, targets: gpd.GeoDataFrame
 ) -> gpd.GeoDataFrame:
@@ -449,22 +610,26 @@ def merge_by_shortest_boundary(
         Updated targets with candidate merged into the best match, or None if
         no valid merge is possible (all merges result in MultiPolygons).
     """
-    new_targets = targets.copy(deep=True)
-    merged_geometries = new_targets.geometry.apply(
-        lambda x: shapely.union(candidate.geometry, x)
+    merged_geometries = shapely.union(
+        candidate.geometry, np.asarray(targets.geometry.values)
     )
     # Drop MultiPolygons (i.e. polygons not unified(two separate polygons))
-    merged_single_parts = merged_geometries[merged_geometries.geom_type == "Polygon"]
+    single_part_pos = np.flatnonzero(
+        shapely.get_type_id(merged_geometries) == shapely.GeometryType.POLYGON
+    )
 
-    if merged_single_parts.empty:
+    if len(single_part_pos) == 0:
         return None
     else:
         # Find the one with shortest boundary
-        shortest_boundary_idx = merged_single_parts.length.idxmin()
+        lengths = shapely.length(merged_geometries[single_part_pos])
+        shortest_boundary_pos = single_part_pos[np.argmin(lengths)]
         # Update geometry
-        new_targets.loc[shortest_boundary_idx, "geometry"] = merged_geometries[
-            shortest_boundary_idx
-        ]
+        new_targets = replace_geometries(
+            targets,
+            shortest_boundary_pos,
+            merged_geometries[shortest_boundary_pos],
+        )
     return new_targets
 
 
@@ -490,103 +655,230 @@ def merge_by_longest_intersection(
         Updated targets with candidate merged into the best match, or None if
         no valid intersection exists.
     """
-    new_targets = targets.copy(deep=True)
-    intersections = new_targets.geometry.apply(
-        lambda x: shapely.intersection(candidate.geometry, x)
+    # Same scoring as the batched merge, empty intersections are not valid
+    is_valid, scores = _longest_intersection_scores(
+        candidate.geometry, np.asarray(targets.geometry.values)
     )
-    # Drop empty geometries
-    proper_intersections = intersections[not intersections.is_empty]
+    proper_pos = np.flatnonzero(is_valid)
 
-    if proper_intersections.empty:
+    if len(proper_pos) == 0:
         return None
     else:
-        longest_intersection_idx = proper_intersections.length.idxmax()
+        longest_intersection_pos = proper_pos[np.argmin(scores[proper_pos])]
         # Update geometry
         new_geom = shapely.union(
             candidate.geometry,
-            new_targets.loc[longest_intersection_idx, "geometry"],
+            targets.geometry.values[longest_intersection_pos],
         )
-        new_targets.loc[longest_intersection_idx, "geometry"] = new_geom
+        new_targets = replace_geometries(targets, longest_intersection_pos, new_geom)
     return new_targets
 
 
 def get_contained_indices(
-    gdf: gpd.GeoDataFrame, containing_geometry: shapely.geometry
-) -> list:
-    return gdf[gdf.geometry.within(containing_geometry)].index
+    gdf: gpd.GeoDataFrame,
+    containing_geometry: shapely.geometry,
+    tree: Optional[shapely.STRtree] = None,
+) -> pd.Index:
+    # Tree over gdf geometries can be given to avoid rebuilding it for every call
+    if tree is None:
+        tree = shapely.STRtree(np.asarray(gdf.geometry.values))
+    contained = tree.query(containing_geometry, predicate="contains")
+    return gdf.index[np.sort(contained)]
 
 
 def add_merged_geometries_property(
     gdf_merged: gpd.GeoDataFrame, gdf_original: gpd.GeoDataFrame
 ) -> gpd.GeoDataFrame:
-    gdf_merged.loc[:, MERGED_GEOM_PROPERTY] = None
-    for idx in gdf_merged.index:
-        merged_geometries = get_contained_indices(
-            gdf_original, gdf_merged.loc[idx, "geometry"]
-        )
-        if len(merged_geometries) > 1:
-            gdf_merged.at[idx, MERGED_GEOM_PROPERTY] = list(merged_geometries)
+    # Find the original geometries within each merged geometry with one bulk query
+    tree = shapely.STRtree(np.asarray(gdf_original.geometry.values))
+    merged_pos, original_pos = tree.query(
+        np.asarray(gdf_merged.geometry.values), predicate="contains"
+    )
+    # Sort hits by merged geometry, keeping the original order within each
+    order = np.lexsort((original_pos, merged_pos))
+    merged_pos, original_pos = merged_pos[order], original_pos[order]
+    merged_unique, counts = np.unique(merged_pos, return_counts=True)
+    original_groups = np.split(original_pos, np.cumsum(counts)[:-1])
+
+    merged_geometries = np.full(len(gdf_merged), None, dtype=object)
+    for pos, group in zip(merged_unique, original_groups):
+        if len(group) > 1:
+            merged_geometries[pos] = list(gdf_original.index[group])
+    gdf_merged[MERGED_GEOM_PROPERTY] = merged_geometries
     return gdf_merged
 
 
+def _shortest_boundary_scores(
+    candidate_geoms: np.ndarray, target_geoms: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    merged = shapely.union(candidate_geoms, target_geoms)
+    # Drop MultiPolygons (i.e. polygons not unified(two separate polygons))
+    is_valid = shapely.get_type_id(merged) == shapely.GeometryType.POLYGON
+    return is_valid, shapely.length(merged)
+
+
+def _longest_intersection_scores(
+    candidate_geoms: np.ndarray, target_geoms: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    intersections = shapely.intersection(candidate_geoms, target_geoms)
+    # Lower score is better, so longer intersections get more negative scores
+    return ~shapely.is_empty(intersections), -shapely.length(intersections)
+
+
+# Pair scoring for each criteria, returns (is_valid, score) with lower is better
+_PAIR_SCORERS = {
+    MergingCriteria.SHORTEST_BOUNDARY: _shortest_boundary_scores,
+    MergingCriteria.LONGEST_INTERSECTION: _longest_intersection_scores,
+}
+
+
+def _score_pairs_in_threads(
+    score_pairs, candidate_geoms: np.ndarray, target_geoms: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # Pairs are scored independently and shapely releases the GIL in its
+    # vectorized functions, so large rounds are split across threads
+    n_chunks = min(os.cpu_count() or 1, len(candidate_geoms) // PARALLEL_MIN_PAIRS)
+    if n_chunks < 2:
+        return score_pairs(candidate_geoms, target_geoms)
+    bounds = np.linspace(0, len(candidate_geoms), n_chunks + 1).astype(int)
+    with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+        results = list(
+            executor.map(
+                lambda start, stop: score_pairs(
+                    candidate_geoms[start:stop], target_geoms[start:stop]
+                ),
+                bounds[:-1],
+                bounds[1:],
+            )
+        )
+    is_valid = np.concatenate([result[0] for result in results])
+    score = np.concatenate([result[1] for result in results])
+    return is_valid, score
+
+
 def merge_geometries_by_criteria(
     candidates: gpd.GeoDataFrame,
     targets: gpd.GeoDataFrame,
     criteria: Optional[MergingCriteria] = MergingCriteria.SHORTEST_BOUNDARY,
 ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
-    updated_candidates = candidates.copy(deep=True)
-    updated_targets = targets.copy(deep=True)
-    while True:
-        something_merged = False
-        current_candidates = updated_candidates.copy(deep=True)
-
-        for idx, candidate in current_candidates.iterrows():
-            if criteria == MergingCriteria.SHORTEST_BOUNDARY:
-                tmp_targets = merge_by_shortest_boundary(candidate, updated_targets)
-            elif criteria == MergingCriteria.LONGEST_INTERSECTION:
-                tmp_targets = merge_by_longest_intersection(candidate, updated_targets)
-
-            if tmp_targets is not None:
-                something_merged = True
-                updated_candidates = updated_candidates.drop(idx)
-                updated_targets = tmp_targets
-
-        if not something_merged:
+    """
+    Merge candidate parcels into adjacent target parcels.
+
+    Candidate-target pairs are found with the spatial index of the targets and
+    scored in a single vectorized pass. Each candidate is merged into its best
+    scoring target and all merges of a round are dissolved at once. Rounds are
+    repeated as long as something is merged, so candidates that only touch other
+    candidates get merged once those have been merged to a target.
+
+    Parameters
+    ----------
+    candidates : gpd.GeoDataFrame
+        Parcels to merge into the targets.
+    targets : gpd.GeoDataFrame
+        Parcels the candidates can be merged into.
+    criteria : MergingCriteria, default=SHORTEST_BOUNDARY
+        Strategy for selecting the target for each candidate.
+
+    Returns
+    -------
+    tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]
+        Updated targets and the candidates that could not be merged.
+
+    Raises
+    ------
+    ValueError
+        If the merging criteria is not recognized.
+    """
+    if criteria not in _PAIR_SCORERS:
+        err_msg = f"Unknown merging criteria: {criteria}"
+        logger.error(err_msg)
+        raise ValueError(err_msg)
+    score_pairs = _PAIR_SCORERS[criteria]
+
+    # Unmerged candidates are tracked by position, rows are selected once at the end
+    all_candidate_geoms = np.asarray(candidates.geometry.values)
+    remaining_pos = np.arange(len(candidates))
+    updated_targets = IncrementalTargets(targets)
+    while len(remaining_pos) > 0 and not updated_targets.gdf.empty:
+        candidate_geoms = all_candidate_geoms[remaining_pos]
+        target_geoms = np.asarray(updated_targets.gdf.geometry.values)
+        candidate_pos, target_pos = updated_targets.query(candidate_geoms)
+
+        is_valid, score = _score_pairs_in_threads(
+            score_pairs, candidate_geoms[candidate_pos], target_geoms[target_pos]
+        )
+        candidate_pos = candidate_pos[is_valid]
+        target_pos = target_pos[is_valid]
+        score = score[is_valid]
+        if len(candidate_pos) == 0:
             break
+        # Best scoring target per candidate: sort by candidate, then score and
+        # take the first pair of each candidate (ties go to the lowest target)
+        order = np.lexsort((target_pos, score, candidate_pos))
+        _, first = np.unique(candidate_pos[order], return_index=True)
+        best_candidates = candidate_pos[order[first]]
+        best_targets = target_pos[order[first]]
+        merged_targets = np.unique(best_targets)
+
+        # Union each target with all candidates merged into it, one union_all
+        # (cascaded GEOS UnaryUnion) per target instead of pairwise unions
+        group_targets = np.concatenate([best_targets, merged_targets])
+        group_geoms = np.concatenate(
+            [candidate_geoms[best_candidates], target_geoms[merged_targets]]
+        )
+        group_order = np.argsort(group_targets, kind="stable")
+        _, group_starts = np.unique(group_targets[group_order], return_index=True)
+        merged_geoms = np.empty(len(merged_targets), dtype=object)
+        merged_geoms[:] = [
+            shapely.union_all(geoms)
+            for geoms in np.split(group_geoms[group_order], group_starts[1:])
+        ]
+        updated_targets.update(merged_targets, merged_geoms)
+        remaining_pos = np.delete(remaining_pos, best_candidates)
 
-    return updated_targets, updated_candidates
+    return updated_targets.gdf, candidates.iloc[remaining_pos]
 
 
 def update_index(
     gdf: gpd.GeoDataFrame, current_max_idx: int
 ) -> tuple[gpd.GeoDataFrame, int]:
-    gdf_cp = gdf.copy(deep=True)
-    new_index = []
-    for idx in gdf_cp.index:
-        if gdf.loc[idx, MERGED_GEOM_PROPERTY] is None:
-            new_index.append(idx)
-        else:
-            new_index.append(current_max_idx + 1)
-            current_max_idx += 1
+    # Merged geometries get new indices after current_max_idx, in row order
+    is_merged = gdf[MERGED_GEOM_PROPERTY].notna().to_numpy()
+    n_merged = int(is_merged.sum())
+    new_index = gdf.index.to_numpy(copy=True)
+    new_index[is_merged] = np.arange(
+        current_max_idx + 1, current_max_idx + 1 + n_merged
+    )
     gdf.index = new_index
-    return gdf, current_max_idx
+    return gdf, current_max_idx + n_merged
+
+
+def min_area_mask(gdf: gpd.GeoDataFrame | gpd.GeoSeries, min_area: float) -> np.ndarray:
+    # Area in hectares
+    return shapely.area(np.asarray(gdf.geometry.values)) / 10000 < min_area
+
+
+def min_width_mask(
+    gdf: gpd.GeoDataFrame | gpd.GeoSeries, min_width: float
+) -> np.ndarray:
+    # Geometries narrower than min_width vanish when buffered inwards
+    return shapely.is_empty(
+        shapely.buffer(np.asarray(gdf.geometry.values), -min_width / 2)
+    )
 
 
 def split_by_min_area(
     gdf: gpd.GeoDataFrame, min_area: float
 ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
-    gdf_lt = gdf[gdf.geometry.area / 10000 < min_area]
-    gdf_ge = gdf[gdf.geometry.area / 10000 >= min_area]
-    return gdf_lt, gdf_ge
+    mask_lt = min_area_mask(gdf, min_area)
+    return gdf[mask_lt], gdf[~mask_lt]
 
 
 def split_by_min_width(
     gdf: gpd.GeoDataFrame, min_width: float
 ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
-    buff = gdf.buffer(-min_width / 2)
-    gdf_lt = gdf[buff.is_empty]
-    gdf_ge = gdf[~buff.is_empty]
-    return gdf_lt, gdf_ge
+    mask_lt = min_width_mask(gdf, min_width)
+    return gdf[mask_lt], gdf[~mask_lt]
 
 
 def split_by_rule(
@@ -594,23 +886,17 @@ def split_by_rule(
     min_area: Optional[float] = None,
     min_width: Optional[float] = None,
 ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
+    mask_lt = np.zeros(len(gdf), dtype=bool)
     if min_area is not None:
-        gdf_lt_area, gdf_ge_area = split_by_min_area(gdf, min_area)
+        mask_lt |= min_area_mask(gdf, min_area)
     if min_width is not None:
-        gdf_lt_width, gdf_ge_width = split_by_min_width(gdf, min_width)
-
-    if min_area is not None and min_width is not None:
-        gdf_lt_idx_union = gdf_lt_area.index.union(gdf_lt_width.index)
-        gdf_lt = gdf.loc[gdf_lt_idx_union]
-        gdf_ge = gdf.drop(gdf_lt_idx_union)
-    elif min_area is not None:
-        gdf_lt = gdf_lt_area
-        gdf_ge = gdf_ge_area
-    elif min_width is not None:
-        gdf_lt = gdf_lt_width
-        gdf_ge = gdf_ge_width
+        # Buffering is the expensive part, skip geometries already below min_area
+        unflagged_pos = np.flatnonzero(~mask_lt)
+        mask_lt[unflagged_pos] = min_width_mask(
+            gdf.geometry.iloc[unflagged_pos], min_width
+        )
 
-    return gdf_lt, gdf_ge
+    return gdf.iloc[np.flatnonzero(mask_lt)], gdf.iloc[np.flatnonzero(~mask_lt)]
 
 
 def merge_geometries(
@@ -674,8 +960,10 @@ def merge_geometries(
         gdf_lt, gdf_ge_updates = split_by_rule(gdf_lt_merged, min_area, min_width)
 
         if not gdf_ge_updates.empty:
+            # Merged geometries property is recomputed for the final result
             gdf_ge = pd.concat(
-                [gdf_ge, gdf_ge_updates.dropna(axis=1)], ignore_index=False
+                [gdf_ge, gdf_ge_updates.drop(columns=MERGED_GEOM_PROPERTY)],
+                ignore_index=False,
             )
 
         # Try merging small geometries to large geometries
@@ -41,14 +41,27 @@ Query parcels by coordinates:
 Author: Olli Nevalainen, Finnish Meteorological Institute
 """
 
+import functools
+import hashlib
+import io
+import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import geopandas as gpd
 import numpy as np
-from urllib.error import HTTPError
 from pathlib import Path
+from urllib.parse import urlencode
 
 try:
     # breaking change introduced in python 3.11
@@ -60,7 +73,36 @@ except ImportError:
         pass
 
 
+try:
+    # pyogrio reads GeoJSON straight into geometry arrays, much faster than fiona
+    import pyogrio
+
+    READ_DATAFRAME_KWARGS = {}
+    try:
+        import pyarrow  # noqa: F401
+
+        READ_DATAFRAME_KWARGS["use_arrow"] = True
+    except ImportError:
+        pass
+except ImportError:
+    pyogrio = None
+    READ_DATAFRAME_KWARGS = {}
+
+try:
+    # orjson parses attribute-only responses several times faster than json
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 import yaml
+
+try:
+    # libyaml based loader is much faster, not available in all yaml installs
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+import shapely
 from shapely.geometry import Point
 from pyproj import Transformer, CRS
 from owslib.wfs import WebFeatureService
@@ -68,6 +110,210 @@ from owslib.wfs import WebFeatureService
 logger = logging.getLogger(__name__)
 
 PARCEL_SEP = "_"
+REQUEST_TIMEOUT = 30  # seconds
+MAX_CONCURRENT_REQUESTS = 8
+MAX_POINTS_PER_QUERY = 50  # keeps the OR'd CQL filter within URL length limits
+QUERY_PAGE_SIZE = 5000  # features per request when a query is paged
+MAX_IDS_PER_QUERY = 100  # keeps the id filter within URL length limits
+MAX_BBOX_FEATURES = 20000  # larger point envelopes use per point filters
+MAX_URL_LENGTH = 4000  # longer requests are sent as POST form data
+CAPABILITIES_TTL = 3600  # seconds before available layers are requested again
+RESPONSE_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds files in cache_dir are used
+RESPONSE_CACHE_MAX_BYTES = 32 * 2**20  # total size of responses kept in memory
+RESPONSE_CACHE_MAX_ITEM_BYTES = 2**20  # larger responses are not kept in memory
+
+# Shared session keeps connections to the WFS servers alive between queries.
+# Requests accept gzip by default. Kept-alive connections may have been closed by
+# the server, so requests are retried on connection errors and gateway errors.
+# GetFeature requests have no side effects, so POSTed queries are retried as well.
+_RETRY = Retry(
+    total=3,
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=_RETRY)
+)
+_SESSION.mount(
+    "http://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=_RETRY)
+)
+
+
+def _read_geojson(
+    content: bytes, encoding: str | None = None, read_geometry: bool = True
+) -> gpd.GeoDataFrame | pd.DataFrame:
+    if not read_geometry:
+        return _read_geojson_properties(content, encoding)
+    # pyogrio reads the response bytes directly, fiona needs a file-like object
+    if pyogrio is not None:
+        return pyogrio.read_dataframe(
+            content, encoding=encoding, **READ_DATAFRAME_KWARGS
+        )
+    return gpd.read_file(io.BytesIO(content), encoding=encoding)
+
+
+def _read_geojson_properties(
+    content: bytes, encoding: str | None = None
+) -> pd.DataFrame:
+    # Without geometries the features are only property dicts, building the
+    # DataFrame from them skips opening the response as an OGR dataset. Decoding
+    # raises UnicodeDecodeError like the OGR readers for the latin-1 fallback.
+    features = _json_loads(content.decode(encoding or "utf-8"))["features"]
+    df = pd.DataFrame([feature["properties"] for feature in features])
+    if features and "id" in features[0] and "id" not in df.columns:
+        # OGR exposes the feature ids as an id column unless a property has the name
+        df.insert(0, "id", [feature.get("id") for feature in features])
+    return df
+
+
+def _fetch_response(endpoint: str, params: dict) -> bytes:
+    # Request data with the shared session. Long filters would exceed the URL
+    # length limits of servers and proxies, those are sent as form data.
+    try:
+        if len(endpoint) + 1 + len(urlencode(params)) > MAX_URL_LENGTH:
+            response = _SESSION.post(endpoint, data=params, timeout=REQUEST_TIMEOUT)
+        else:
+            response = _SESSION.get(endpoint, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.HTTPError as err:
+        err_msg = "Error when querying WFS with URL. Possibly invalid parcel id."
+        logger.error(err_msg)
+        raise Exception(err_msg) from err
+    return response.content
+
+
+def _read_cached_response(path: Path) -> bytes | None:
+    # Responses older than RESPONSE_CACHE_MAX_AGE are requested again
+    try:
+        if time.time() - path.stat().st_mtime > RESPONSE_CACHE_MAX_AGE:
+            return None
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached_response(path: Path, content: bytes):
+    # Write to a temporary file first, concurrent readers never see a partially
+    # written response
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, suffix=".tmp", delete=False
+    ) as fp:
+        fp.write(content)
+    os.replace(fp.name, path)
+
+
+class _ResponseCache:
+    # Least recently used GetFeature responses bounded by their total size. The
+    # responses are immutable bytes, every caller parses its own DataFrame. Entries
+    # expire together with the cached capabilities through ttl_key.
+
+    def __init__(self, max_bytes: int, max_item_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._entries: OrderedDict[tuple, tuple[int, bytes]] = OrderedDict()
+        self._n_bytes = 0
+        # Queries run in worker threads
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, ttl_key: int) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != ttl_key:
+                self._n_bytes -= len(self._entries.pop(key)[1])
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, ttl_key: int, content: bytes):
+        if len(content) > self.max_item_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._n_bytes -= len(previous[1])
+            self._entries[key] = (ttl_key, content)
+            self._n_bytes += len(content)
+            while self._n_bytes > self.max_bytes:
+                self._n_bytes -= len(self._entries.popitem(last=False)[1][1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._n_bytes = 0
+
+
+_RESPONSE_CACHE = _ResponseCache(
+    RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ITEM_BYTES
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_parcelwfs_yaml(
+    file_path: Path, mtime_ns: int, cache_dir_env: str | None
+) -> "ParcelWFS":
+    # mtime_ns is part of the cache key so that edited files are read again, and
+    # cache_dir_env because the default cache_dir is read from it
+    with open(file_path, "r", encoding="utf-8") as fp:
+        yaml_data = yaml.load(fp, Loader=_YamlLoader)
+    return ParcelWFS.model_validate(yaml_data)
+
+
+def _capabilities_ttl_key() -> int:
+    # Changes every CAPABILITIES_TTL seconds, so cached capabilities expire when
+    # it is part of the cache key
+    return int(time.monotonic() // CAPABILITIES_TTL)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_wfs_contents(endpoint: str, wfs_version: str, ttl_key: int) -> dict:
+    # GetCapabilities is requested once per endpoint and version within the TTL
+    wfs = WebFeatureService(url=endpoint, version=wfs_version)
+    return wfs.contents
+
+
+def _is_parcel_layer(layer: str, layer_base_name: str) -> bool:
+    # Parcel layers are named by the base name followed by the year
+    return layer.startswith(layer_base_name) and layer[len(layer_base_name) :].isdigit()
+
+
+@functools.lru_cache(maxsize=32)
+def _get_parcel_years(
+    endpoint: str, wfs_version: str, layer_base_name: str, ttl_key: int
+) -> tuple[int, ...]:
+    years = [
+        int(layer[len(layer_base_name) :])
+        for layer in _get_wfs_contents(endpoint, wfs_version, ttl_key)
+        if _is_parcel_layer(layer, layer_base_name)
+    ]
+    return tuple(sorted(years))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_parcel_year_set(
+    endpoint: str, wfs_version: str, layer_base_name: str, ttl_key: int
+) -> frozenset[int]:
+    # Year checks before each query are set lookups
+    return frozenset(_get_parcel_years(endpoint, wfs_version, layer_base_name, ttl_key))
+
+
+@functools.lru_cache(maxsize=128)
+def _get_layer_crs(endpoint: str, wfs_version: str, layer_name: str) -> CRS:
+    # The CRS of a published layer does not change, so it is cached without TTL
+    contents = _get_wfs_contents(endpoint, wfs_version, _capabilities_ttl_key())
+    layer_crs = contents[layer_name].crsOptions[0]
+    return CRS.from_user_input(layer_crs.id)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_transformer_from_wgs84(target_crs: CRS | str) -> Transformer:
+    # Creating a Transformer is far more expensive than transforming a point
+    return Transformer.from_crs("epsg:4326", target_crs)
 
 
 class ParcelType(StrEnum):
@@ -98,6 +344,8 @@ class WFSLayers(BaseModel):
         Base layer name for LPIS parcels (year suffix is appended).
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     gsaa: str
     lpis: str
 
@@ -114,6 +362,8 @@ class Endpoints(BaseModel):
         URL endpoint for LPIS WFS service.
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     gsaa: str
     lpis: str
 
@@ -144,6 +394,8 @@ class GSAAPropertyMapping(BaseModel):
         Property name for parcel geometry.
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     year: str | None
     lpis_parcel_id: str
@@ -182,12 +434,22 @@ class LPISPropertyMapping(BaseModel):
         Property name for parcel geometry.
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     year: str | None
     lpis_parcel_id: str
     area: str
     geometry: str
 
+    @field_validator("year", mode="before")
+    @classmethod
+    def set_year_default(cls, v):
+        """Set default value for year if None is provided."""
+        if v is None:
+            return "year"
+        return v
+
 
 class ParcelWFS(BaseModel):
     """
@@ -211,6 +473,18 @@ class ParcelWFS(BaseModel):
         Property name mappings for LPIS parcels.
     wfs_version : str, default="2.0.0"
         WFS protocol version to use.
+    coord_precision : int or None, default=None
+        Number of decimals of point coordinates in spatial filters. If None, 7
+        decimals are used for geographic and 3 decimals (1 mm) for projected CRSs.
+    cache_dir : Path or None
+        Directory of parcels downloaded with :meth:`prefetch` and of cached WFS
+        responses. If set, point lookups use the downloaded parcels and repeated
+        queries use the stored responses before querying the WFS. Downloaded
+        parcels and non-empty responses are used for RESPONSE_CACHE_MAX_AGE
+        seconds, parcels changed on the server within that time are only seen
+        after :meth:`clear_prefetched_parcels` and :meth:`clear_response_cache`.
+        Defaults to the PARCELWFS_CACHE_DIR environment variable, caching is
+        disabled if unset.
 
     Examples
     --------
@@ -219,12 +493,38 @@ class ParcelWFS(BaseModel):
     >>> species = wfs.get_gsaa_parcel_species_by_lat_lon(60.1699, 24.9384, year=2023)
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     endpoints: Endpoints
     layers: WFSLayers
     gsaa_properties: GSAAPropertyMapping
     lpis_properties: LPISPropertyMapping
     wfs_version: str = "2.0.0"  # Not sure if even works with versions < 2.0.0
+    coord_precision: int | None = None
+    cache_dir: Path | None = Field(
+        default_factory=lambda: os.environ.get("PARCELWFS_CACHE_DIR"),
+        validate_default=True,
+    )
+
+    # Lookups by parcel type, built once after validation
+    _endpoint_by_type: dict[ParcelType, str]
+    _layer_by_type: dict[ParcelType, str]
+    _properties_by_type: dict[ParcelType, GSAAPropertyMapping | LPISPropertyMapping]
+
+    def model_post_init(self, __context) -> None:
+        self._endpoint_by_type = {
+            ParcelType.GSAA: self.endpoints.gsaa,
+            ParcelType.LPIS: self.endpoints.lpis,
+        }
+        self._layer_by_type = {
+            ParcelType.GSAA: self.layers.gsaa,
+            ParcelType.LPIS: self.layers.lpis,
+        }
+        self._properties_by_type = {
+            ParcelType.GSAA: self.gsaa_properties,
+            ParcelType.LPIS: self.lpis_properties,
+        }
 
     @classmethod
     def from_yaml(cls, file_path: str) -> "ParcelWFS":
@@ -240,10 +540,19 @@ class ParcelWFS(BaseModel):
         -------
         ParcelWFS
             Configured ParcelWFS instance.
+
+        Notes
+        -----
+        Validated configurations are cached per file, modification time and
+        PARCELWFS_CACHE_DIR environment variable. The configuration is immutable,
+        so the cached instance is shared.
         """
-        with open(file_path, "r", encoding="utf-8") as fp:
-            yaml_data = yaml.safe_load(fp)
-        return ParcelWFS.model_validate(yaml_data)
+        file_path = Path(file_path).resolve()
+        return _load_parcelwfs_yaml(
+            file_path,
+            file_path.stat().st_mtime_ns,
+            os.environ.get("PARCELWFS_CACHE_DIR"),
+        )
 
     @classmethod
     def get_by_id(cls, parcelwfs_id: str) -> "ParcelWFS":
@@ -277,10 +586,44 @@ class ParcelWFS(BaseModel):
         list
             List of available layer names in the WFS service.
         """
-        wfs = WebFeatureService(
-            url=getattr(self.endpoints, parcel_type.value), version=self.wfs_version
+        return list(self.get_wfs_contents(parcel_type))
+
+    def get_wfs_contents(self, parcel_type: ParcelType) -> dict:
+        """
+        Get the layer contents of the WFS service for a parcel type.
+
+        The GetCapabilities response is cached per endpoint and WFS version for
+        CAPABILITIES_TTL seconds, see :meth:`clear_cache`.
+
+        Parameters
+        ----------
+        parcel_type : ParcelType
+            Type of parcel (GSAA or LPIS).
+
+        Returns
+        -------
+        dict
+            Mapping of layer names to owslib layer metadata.
+        """
+        return _get_wfs_contents(
+            self._endpoint_by_type[parcel_type],
+            self.wfs_version,
+            _capabilities_ttl_key(),
         )
-        return list(wfs.contents)
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Clear the cached WFS capabilities, years, layer CRSs and responses of all
+        endpoints.
+
+        Responses stored in cache_dir are kept, see :meth:`clear_response_cache`.
+        """
+        _get_wfs_contents.cache_clear()
+        _get_parcel_years.cache_clear()
+        _get_parcel_year_set.cache_clear()
+        _get_layer_crs.cache_clear()
+        _RESPONSE_CACHE.clear()
 
     def get_available_parcel_layers(
         self, parcel_type: ParcelType = ParcelType.GSAA
@@ -300,10 +643,9 @@ class ParcelWFS(BaseModel):
         """
         all_layers = self.get_available_layers(parcel_type=parcel_type)
 
+        layer_base_name = self._layer_by_type[parcel_type]
         field_parcel_layers = [
-            layer
-            for layer in all_layers
-            if getattr(self.layers, parcel_type.value) in layer
+            layer for layer in all_layers if _is_parcel_layer(layer, layer_base_name)
         ]
 
         return field_parcel_layers
@@ -322,16 +664,46 @@ class ParcelWFS(BaseModel):
         Returns
         -------
         list or None
-            List of available years as integers, or None if no layers found.
+            Sorted list of available years as integers, or None if no layers found.
         """
-        field_parcel_layers = self.get_available_parcel_layers(parcel_type)
-        if not field_parcel_layers:
+        years = _get_parcel_years(
+            self._endpoint_by_type[parcel_type],
+            self.wfs_version,
+            self._layer_by_type[parcel_type],
+            _capabilities_ttl_key(),
+        )
+        if not years:
             return None
         else:
-            return [
-                int(layer.split(getattr(self.layers, parcel_type.value))[-1])
-                for layer in field_parcel_layers
-            ]
+            return list(years)
+
+    def check_year_available(self, year: int, parcel_type: ParcelType) -> None:
+        """
+        Check that a parcel layer is available for the given year.
+
+        Parameters
+        ----------
+        year : int
+            Year to check.
+        parcel_type : ParcelType
+            Type of parcel (GSAA or LPIS).
+
+        Raises
+        ------
+        ValueError
+            If the layer for the given year is not available.
+        """
+        years_available = _get_parcel_year_set(
+            self._endpoint_by_type[parcel_type],
+            self.wfs_version,
+            self._layer_by_type[parcel_type],
+            _capabilities_ttl_key(),
+        )
+        if year not in years_available:
+            raise ValueError(
+                f"""Field parcel layer not available for year {year}. Currently
+                            available years: {sorted(years_available)}"""
+            )
 
     def handle_output(
         self,
@@ -339,6 +711,7 @@ class ParcelWFS(BaseModel):
         year: int,
         to_series: bool,
         output_crs: CRS | None,
+        parcel_type: ParcelType = ParcelType.GSAA,
     ) -> gpd.GeoDataFrame | pd.Series | None:
         """
         Process and format query output.
@@ -356,6 +729,8 @@ class ParcelWFS(BaseModel):
             If True, return first row as Series instead of GeoDataFrame.
         output_crs : CRS or None
             Target coordinate reference system for reprojection.
+        parcel_type : ParcelType, default=ParcelType.GSAA
+            Type of the queried parcels, selects the year property to check.
 
         Returns
         -------
@@ -364,23 +739,38 @@ class ParcelWFS(BaseModel):
         """
         if gdf is None or gdf.empty:
             return None
-        if output_crs is not None:
+        if to_series:
+            # Only the first row is returned, do not reproject the others
+            gdf = gdf.take([0])
+        # Geometries requested with srsName are already in the output CRS
+        if (
+            output_crs is not None
+            and isinstance(gdf, gpd.GeoDataFrame)
+            and gdf.crs != CRS.from_user_input(output_crs)
+        ):
             gdf = gdf.to_crs(crs=output_crs)
 
         # Add year column if not present
-        if (
-            self.gsaa_properties.year not in gdf.columns
-            or self.lpis_properties.year not in gdf.columns
-        ):
-            gdf["year"] = year
+        year_property = self._properties_by_type[parcel_type].year
+        if year_property not in gdf.columns:
+            gdf[year_property] = year
         if to_series:
             return gdf.iloc[0]
         else:
             return gdf
 
     def query(
-        self, query_filter: str, year: int, parcel_type: ParcelType
-    ) -> gpd.GeoDataFrame:
+        self,
+        query_filter: str,
+        year: int,
+        parcel_type: ParcelType,
+        output_crs: CRS | None = None,
+        properties: list[str] | None = None,
+        skip_geometry: bool = False,
+        assume_year_valid: bool = False,
+        max_features: int | None = None,
+        use_cache: bool = True,
+    ) -> gpd.GeoDataFrame | pd.DataFrame:
         """
         Execute a WFS query with the specified filter.
 
@@ -392,11 +782,33 @@ class ParcelWFS(BaseModel):
             Year to query.
         parcel_type : ParcelType
             Type of parcel (GSAA or LPIS).
+        output_crs : CRS, optional
+            Coordinate reference system to request the geometries in with the WFS
+            srsName parameter. Filter geometries are still in the layer CRS.
+        properties : list[str], optional
+            Properties to request with the WFS propertyName parameter, the geometry
+            property is included unless skip_geometry is True. All properties are
+            returned if None.
+        skip_geometry : bool, default=False
+            If True, geometries are not parsed and a plain DataFrame is returned.
+        assume_year_valid : bool, default=False
+            If True, the year is not checked against the available layers, e.g.
+            when it has already been checked by the caller.
+        max_features : int, optional
+            Maximum number of features to return. If given, features are requested
+            in pages of at most QUERY_PAGE_SIZE features with the WFS startIndex and
+            count parameters, so that only one raw page response is held in memory at
+            a time. All features are requested at once if None.
+        use_cache : bool, default=True
+            If False, cached responses are neither used nor stored. Non-empty
+            responses of at most RESPONSE_CACHE_MAX_ITEM_BYTES are cached in memory,
+            and all non-empty responses in cache_dir if it is set, see
+            :meth:`clear_response_cache`.
 
         Returns
         -------
-        gpd.GeoDataFrame
-            Query results as a GeoDataFrame.
+        gpd.GeoDataFrame or pd.DataFrame
+            Query results as a GeoDataFrame, or a DataFrame if skip_geometry is True.
 
         Raises
         ------
@@ -405,13 +817,9 @@ class ParcelWFS(BaseModel):
         Exception
             If the WFS query fails.
         """
-        years_available = self.get_available_parcel_years(parcel_type)
-        if year not in years_available:
-            raise ValueError(
-                f"""Field parcel layer not available for year {year}. Currently
-                            available years: {years_available}"""
-            )
-        layer_name = f"{getattr(self.layers, parcel_type.value)}{year}"
+        if not assume_year_valid:
+            self.check_year_available(year, parcel_type)
+        layer_name = f"{self._layer_by_type[parcel_type]}{year}"
 
         params = dict(
             service="WFS",
@@ -421,40 +829,157 @@ class ParcelWFS(BaseModel):
             cql_filter=query_filter,
             outputFormat="json",
         )
+        # Let the server reproject instead of transforming the geometries locally
+        output_epsg = (
+            CRS.from_user_input(output_crs).to_epsg()
+            if output_crs is not None and not skip_geometry
+            else None
+        )
+        if output_epsg is not None:
+            params["srsName"] = f"EPSG:{output_epsg}"
+        # Only transfer and parse the properties that are needed
+        if properties is not None:
+            if not skip_geometry:
+                properties = [
+                    *properties,
+                    self._properties_by_type[parcel_type].geometry,
+                ]
+            params["propertyName"] = ",".join(properties)
 
-        # Parse the URL with parameters
-        wfs_request_url = (
-            requests.Request(
-                "GET", getattr(self.endpoints, parcel_type.value), params=params
+        endpoint = self._endpoint_by_type[parcel_type]
+        if max_features is None:
+            gdf = self._get_features(endpoint, params, skip_geometry, use_cache)
+        else:
+            pages = list(
+                self._query_paged(
+                    endpoint,
+                    params,
+                    skip_geometry,
+                    max_features,
+                    use_cache,
+                    sort_by=self._properties_by_type[parcel_type].id,
+                )
             )
-            .prepare()
-            .url
-        )
+            gdf = pd.concat(pages, ignore_index=True) if pages else None
+        if gdf is None or gdf.empty:
+            logger.info(f"No field parcel with given query parameters: {params}.")
+            return None
+        if output_epsg is not None:
+            gdf = gdf.set_crs(epsg=output_epsg, allow_override=True)
+        return gdf
 
-        # Read data from URL
-        try:
-            gdf = gpd.read_file(wfs_request_url)
+    def _query_paged(
+        self,
+        endpoint: str,
+        params: dict,
+        skip_geometry: bool,
+        max_features: int,
+        use_cache: bool = True,
+        page_size: int = QUERY_PAGE_SIZE,
+        sort_by: str | None = None,
+    ) -> Iterator[gpd.GeoDataFrame | pd.DataFrame]:
+        # Yields pages until max_features is reached or a page is not full. WFS
+        # 1.x limits the features with maxFeatures and has no paging.
+        paged = self.wfs_version.startswith("2")
+        count_param = "count" if paged else "maxFeatures"
+        if paged and sort_by is not None and max_features > page_size:
+            # WFS 2.0 only guarantees a stable feature order between requests when
+            # it is sorted, otherwise pages could overlap or skip features
+            params = {**params, "sortBy": sort_by}
+        start_index = 0
+        while start_index < max_features:
+            count = min(page_size, max_features - start_index)
+            page_params = {**params, count_param: count}
+            if start_index > 0:
+                page_params["startIndex"] = start_index
+            page = self._get_features(endpoint, page_params, skip_geometry, use_cache)
+            if page is None or page.empty:
+                return
+            yield page
+            if len(page) < count:
+                return
+            start_index += count
+
+    def _get_features(
+        self, endpoint: str, params: dict, skip_geometry: bool, use_cache: bool = True
+    ) -> gpd.GeoDataFrame | pd.DataFrame | None:
+        # GetFeature responses are deterministic for given parameters, so they are
+        # kept in memory and stored in cache_dir when it is set
+        if not use_cache:
+            return self._read_response(_fetch_response(endpoint, params), skip_geometry)
+
+        memory_key = (endpoint, tuple(sorted(params.items())))
+        ttl_key = _capabilities_ttl_key()
+        content = _RESPONSE_CACHE.get(memory_key, ttl_key)
+        if content is not None:
+            return self._read_response(content, skip_geometry)
+
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self._response_cache_path(endpoint, params)
+            content = _read_cached_response(cache_path)
+        from_disk = content is not None
+        if content is None:
+            content = _fetch_response(endpoint, params)
+
+        gdf = self._read_response(content, skip_geometry)
+        # Empty results are not stored, parcels may still be added to the layer
+        if gdf is not None and not gdf.empty:
+            _RESPONSE_CACHE.put(memory_key, ttl_key, content)
+            if cache_path is not None and not from_disk:
+                _write_cached_response(cache_path, content)
+        return gdf
 
+    @staticmethod
+    def _read_response(
+        content: bytes, skip_geometry: bool
+    ) -> gpd.GeoDataFrame | pd.DataFrame | None:
+        # Read data from the response
+        try:
+            return _read_geojson(content, read_geometry=not skip_geometry)
         except UnicodeDecodeError:
             logger.debug("UnicodeDecodeError caught, trying with different encoding.")
             try:
-                gdf = gpd.read_file(wfs_request_url, encoding="latin-1")
+                return _read_geojson(
+                    content,
+                    encoding="latin-1",
+                    read_geometry=not skip_geometry,
+                )
             except Exception as err:
                 logger.error(f"Error reading WFS response with latin-1 encoding: {err}")
                 return None
-        except HTTPError as err:
-            err_msg = "Error when querying WFS with URL. Possibly invalid parcel id."
-            logger.error(err_msg)
-            raise Exception(err_msg) from err
-        finally:
-            if gdf.empty:
-                logger.info(f"No field parcel with given query parameters: {params}.")
-                return None
-        return gdf
+
+    def _response_cache_path(self, endpoint: str, params: dict) -> Path:
+        key = json.dumps([endpoint, params], sort_keys=True, default=str)
+        return (
+            Path(self.cache_dir)
+            / "responses"
+            / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+        )
+
+    def clear_response_cache(self):
+        """Remove the WFS responses cached in memory and stored in cache_dir."""
+        _RESPONSE_CACHE.clear()
+        if self.cache_dir is None:
+            return
+        for path in (Path(self.cache_dir) / "responses").glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def clear_prefetched_parcels(self):
+        """Remove the parcels downloaded with :meth:`prefetch` from cache_dir."""
+        if self.cache_dir is None:
+            return
+        for path in Path(self.cache_dir).glob(f"{self.id}_*.fgb"):
+            path.unlink(missing_ok=True)
 
     def get_gsaa_parcels_by_lpis_parcel_id(
-        self, lpis_parcel_id: str, year: int, output_crs: CRS | None = None
-    ) -> gpd.GeoDataFrame | None:
+        self,
+        lpis_parcel_id: str,
+        year: int,
+        output_crs: CRS | None = None,
+        properties: list[str] | None = None,
+        skip_geometry: bool = False,
+    ) -> gpd.GeoDataFrame | pd.DataFrame | None:
         """
         Get all GSAA parcels associated with an LPIS parcel ID.
 
@@ -466,16 +991,22 @@ class ParcelWFS(BaseModel):
             Year to query.
         output_crs : CRS, optional
             Target coordinate reference system for output geometries.
+        properties : list[str], optional
+            GSAA properties to request, all properties if None.
+        skip_geometry : bool, default=False
+            If True, geometries are not requested and a plain DataFrame is returned.
 
         Returns
         -------
-        gpd.GeoDataFrame or None
+        gpd.GeoDataFrame, pd.DataFrame or None
             GeoDataFrame of all GSAA parcels within the LPIS parcel, or None if not found.
         """
         # Need to single quote the parcel id, otherwise won't work with parcel IDs starting with 0
         query_filter = f"{self.gsaa_properties.lpis_parcel_id}='{lpis_parcel_id}'"
         # Read data from URL
-        gdf = self.query(query_filter, year, ParcelType.GSAA)
+        gdf = self.query(
+            query_filter, year, ParcelType.GSAA, output_crs, properties, skip_geometry
+        )
         return self.handle_output(gdf, year, to_series=False, output_crs=output_crs)
 
     def get_gsaa_parcel_by_id(
@@ -507,15 +1038,148 @@ class ParcelWFS(BaseModel):
             f"AND {self.gsaa_properties.gsaa_parcel_name}='{gsaa_parcel_name}'"
         )
         # Read data from URL
-        gdf = self.query(query_filter, year, ParcelType.GSAA)
+        # Only the first matching feature is returned
+        gdf = self.query(
+            query_filter, year, ParcelType.GSAA, output_crs, max_features=1
+        )
         return self.handle_output(gdf, year, to_series=True, output_crs=output_crs)
 
+    def get_gsaa_parcels_by_ids(
+        self, gsaa_parcel_ids: list[str], year: int, output_crs: CRS | None = None
+    ) -> gpd.GeoDataFrame | None:
+        """
+        Get multiple GSAA parcels by their full IDs with batched WFS requests.
+
+        The parcels are requested with one filter per at most MAX_IDS_PER_QUERY
+        LPIS parcels, the requests are made concurrently.
+
+        Parameters
+        ----------
+        gsaa_parcel_ids : list[str]
+            GSAA parcel IDs of form '{LPIS_PARCEL_ID}/{GSAA_PARCEL_NAME}'.
+        year : int
+            Get parcels for this year.
+        output_crs : CRS, optional
+            Target coordinate reference system for output geometries.
+
+        Returns
+        -------
+        gpd.GeoDataFrame or None
+            GeoDataFrame of the GSAA parcels, or None if none were found.
+        """
+        # Group the names by LPIS parcel to filter each LPIS parcel with one IN clause
+        gsaa_parcel_names = {}
+        for gsaa_parcel_id in gsaa_parcel_ids:
+            gsaa_parcel_id_split = gsaa_parcel_id.split(PARCEL_SEP)
+            lpis_parcel_id = gsaa_parcel_id_split[0]
+            gsaa_parcel_name = gsaa_parcel_id_split[1]
+            gsaa_parcel_names.setdefault(lpis_parcel_id, []).append(gsaa_parcel_name)
+        id_filters = []
+        for lpis_parcel_id, names in gsaa_parcel_names.items():
+            names_str = ",".join(f"'{name}'" for name in names)
+            id_filters.append(
+                f"({self.gsaa_properties.lpis_parcel_id}='{lpis_parcel_id}' "
+                f"AND {self.gsaa_properties.gsaa_parcel_name} IN ({names_str}))"
+            )
+        if not id_filters:
+            return None
+        gdf = self._query_chunked(id_filters, year, ParcelType.GSAA, output_crs)
+        return self.handle_output(gdf, year, to_series=False, output_crs=output_crs)
+
+    def get_lpis_parcels_by_ids(
+        self, lpis_parcel_ids: list[str], year: int, output_crs: CRS | None = None
+    ) -> gpd.GeoDataFrame | None:
+        """
+        Get multiple LPIS parcels by their IDs with batched WFS requests.
+
+        The parcels are requested with one IN filter per at most MAX_IDS_PER_QUERY
+        parcel IDs, the requests are made concurrently.
+
+        Parameters
+        ----------
+        lpis_parcel_ids : list[str]
+            LPIS parcel identifiers.
+        year : int
+            Get parcels for this year.
+        output_crs : CRS, optional
+            Target coordinate reference system for output geometries.
+
+        Returns
+        -------
+        gpd.GeoDataFrame or None
+            GeoDataFrame of the LPIS parcels, or None if none were found.
+        """
+        # Duplicates are dropped, the order of the first occurrences is kept
+        lpis_parcel_ids = list(dict.fromkeys(lpis_parcel_ids))
+        if not lpis_parcel_ids:
+            return None
+        lpis_col = self.lpis_properties.lpis_parcel_id
+        id_filters = [
+            f"{lpis_col} IN ("
+            + ",".join(f"'{lpis_parcel_id}'" for lpis_parcel_id in chunk)
+            + ")"
+            for chunk in (
+                lpis_parcel_ids[start : start + MAX_IDS_PER_QUERY]
+                for start in range(0, len(lpis_parcel_ids), MAX_IDS_PER_QUERY)
+            )
+        ]
+        # Each IN filter already holds MAX_IDS_PER_QUERY ids, so one per request
+        gdf = self._query_chunked(
+            id_filters, year, ParcelType.LPIS, output_crs, filters_per_query=1
+        )
+        return self.handle_output(
+            gdf,
+            year,
+            to_series=False,
+            output_crs=output_crs,
+            parcel_type=ParcelType.LPIS,
+        )
+
+    def _query_chunked(
+        self,
+        id_filters: list[str],
+        year: int,
+        parcel_type: ParcelType,
+        output_crs: CRS | None,
+        filters_per_query: int = MAX_IDS_PER_QUERY,
+    ) -> gpd.GeoDataFrame | None:
+        # OR the filters together in chunks that keep the URL short enough and
+        # request the chunks concurrently
+        query_filters = [
+            " OR ".join(id_filters[start : start + filters_per_query])
+            for start in range(0, len(id_filters), filters_per_query)
+        ]
+        if len(query_filters) == 1:
+            return self.query(query_filters[0], year, parcel_type, output_crs)
+
+        self.check_year_available(year, parcel_type)
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_CONCURRENT_REQUESTS, len(query_filters))
+        ) as executor:
+            results = [
+                gdf
+                for gdf in executor.map(
+                    lambda query_filter: self.query(
+                        query_filter,
+                        year,
+                        parcel_type,
+                        output_crs,
+                        assume_year_valid=True,
+                    ),
+                    query_filters,
+                )
+                if gdf is not None
+            ]
+        return pd.concat(results, ignore_index=True) if results else None
+
     def get_parcel_by_point(
         self,
         point_in_wfs_crs: Point,
         year: int,
         parcel_type: ParcelType,
         output_crs: CRS | None = None,
+        properties: list[str] | None = None,
+        skip_geometry: bool = False,
     ) -> pd.Series:
         """
         Get a parcel that intersects with a given point.
@@ -530,23 +1194,282 @@ class ParcelWFS(BaseModel):
             Type of parcel (GSAA or LPIS).
         output_crs : CRS, optional
             Target coordinate reference system for output geometry.
+        properties : list[str], optional
+            Properties to request, all properties if None.
+        skip_geometry : bool, default=False
+            If True, the parcel geometry is not requested.
 
         Returns
         -------
         pd.Series
             Series containing the parcel data and geometry.
         """
-        x = point_in_wfs_crs.x
-        y = point_in_wfs_crs.y
-        geom_property = (
-            self.gsaa_properties.geometry
-            if parcel_type == ParcelType.GSAA
-            else self.lpis_properties.geometry
+        source_crs = self.get_layer_crs(parcel_type, year)
+        return self._get_parcel_by_xy(
+            point_in_wfs_crs.x,
+            point_in_wfs_crs.y,
+            source_crs,
+            year,
+            parcel_type,
+            output_crs=output_crs,
+            properties=properties,
+            skip_geometry=skip_geometry,
         )
-        spatial_filter = f"Intersects({geom_property},POINT ({x} {y}))"
-        # Read data from URL
-        gdf = self.query(spatial_filter, year, parcel_type)
-        return self.handle_output(gdf, year, to_series=True, output_crs=output_crs)
+
+    def _get_parcel_by_xy(
+        self,
+        x: float,
+        y: float,
+        source_crs: CRS,
+        year: int,
+        parcel_type: ParcelType,
+        output_crs: CRS | None = None,
+        properties: list[str] | None = None,
+        skip_geometry: bool = False,
+    ) -> pd.Series | None:
+        # Point lookup in the layer CRS, the year must already be checked
+        gdf = None
+        if self.cache_dir is not None:
+            gdf = self._get_cached_parcels_by_xy(x, y, year, parcel_type)
+        if gdf is not None:
+            if skip_geometry:
+                gdf = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+            if properties is not None:
+                columns = (
+                    properties if skip_geometry else [*properties, gdf.geometry.name]
+                )
+                gdf = gdf[columns]
+        else:
+            spatial_filter = self._intersects_filter(x, y, parcel_type, source_crs)
+            gdf = self.query(
+                spatial_filter,
+                year,
+                parcel_type,
+                properties=properties,
+                skip_geometry=skip_geometry,
+                assume_year_valid=True,
+                max_features=1,
+            )
+        return self.handle_output(
+            gdf, year, to_series=True, output_crs=output_crs, parcel_type=parcel_type
+        )
+
+    def _cache_file_name(
+        self, year: int, parcel_type: ParcelType, bbox: tuple[float, ...]
+    ) -> str:
+        # The bounding box is stored in the name to find the files covering a point
+        return (
+            "_".join(
+                [self.id, parcel_type.value, str(year), *(repr(float(v)) for v in bbox)]
+            )
+            + ".fgb"
+        )
+
+    def _get_cached_parcels_by_xy(
+        self, x: float, y: float, year: int, parcel_type: ParcelType
+    ) -> gpd.GeoDataFrame | None:
+        # Parcels intersecting the point from the prefetched files covering it
+        pattern = f"{self.id}_{parcel_type.value}_{year}_*.fgb"
+        now = time.time()
+        for path in sorted(Path(self.cache_dir).glob(pattern)):
+            minx, miny, maxx, maxy = map(float, path.stem.rsplit("_", 4)[1:])
+            if not (minx <= x <= maxx and miny <= y <= maxy):
+                continue
+            # Outdated downloads are ignored like stored responses
+            try:
+                if now - path.stat().st_mtime > RESPONSE_CACHE_MAX_AGE:
+                    continue
+            except FileNotFoundError:
+                continue
+            # FlatGeobuf files have a spatial index, only nearby parcels are read
+            gdf = gpd.read_file(path, bbox=(x, y, x, y))
+            gdf = gdf[shapely.intersects_xy(gdf.geometry.values, x, y)]
+            if not gdf.empty:
+                return gdf.reset_index(drop=True)
+        return None
+
+    def prefetch(
+        self,
+        bbox: tuple[float, float, float, float],
+        year: int,
+        parcel_type: ParcelType,
+    ) -> Path | None:
+        """
+        Download the parcels within a bounding box to the local cache directory.
+
+        The parcels are stored as FlatGeobuf files in cache_dir for
+        RESPONSE_CACHE_MAX_AGE seconds. Point lookups within the bounding box that
+        hit a downloaded parcel are then answered from the file. Other lookups,
+        including points within the bounding box without a downloaded parcel,
+        still query the WFS.
+
+        Parameters
+        ----------
+        bbox : tuple[float, float, float, float]
+            Bounding box (minx, miny, maxx, maxy) in the layer CRS.
+        year : int
+            Year to download.
+        parcel_type : ParcelType
+            Type of parcel (GSAA or LPIS).
+
+        Returns
+        -------
+        Path or None
+            Path of the written file, or None if there are no parcels in the
+            bounding box.
+
+        Raises
+        ------
+        ValueError
+            If cache_dir is not set or the year is not available.
+        """
+        if self.cache_dir is None:
+            raise ValueError("cache_dir must be set to prefetch parcels.")
+        source_crs = self.get_layer_crs(parcel_type, year)
+        geom_property = self._properties_by_type[parcel_type].geometry
+        minx, miny, maxx, maxy = bbox
+        query_filter = f"BBOX({geom_property},{minx},{miny},{maxx},{maxy})"
+        # The parcels are stored as FlatGeobuf, not again as a cached response
+        gdf = self.query(
+            query_filter, year, parcel_type, assume_year_valid=True, use_cache=False
+        )
+        if gdf is None:
+            return None
+        # Without srsName the geometries are in the layer CRS
+        gdf = gdf.set_crs(source_crs, allow_override=True)
+        path = Path(self.cache_dir) / self._cache_file_name(year, parcel_type, bbox)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        gdf.to_file(path, driver="FlatGeobuf")
+        return path
+
+    def get_parcels_by_points(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        year: int,
+        parcel_type: ParcelType,
+        output_crs: CRS | None = None,
+        use_bbox: bool = False,
+    ) -> gpd.GeoDataFrame | None:
+        """
+        Get the parcels that intersect with given lat/lon points.
+
+        Points are transformed to the layer CRS at once and queried with OR'd
+        intersection filters, at most MAX_POINTS_PER_QUERY points per request.
+        Alternatively, all parcels within the bounding box of the points are
+        requested at once, which suits many points in a small area.
+
+        Parameters
+        ----------
+        lats : np.ndarray
+            Latitudes in WGS84 (EPSG:4326).
+        lons : np.ndarray
+            Longitudes in WGS84 (EPSG:4326).
+        year : int
+            Year to query.
+        parcel_type : ParcelType
+            Type of parcel (GSAA or LPIS).
+        output_crs : CRS, optional
+            Target coordinate reference system for output geometries.
+        use_bbox : bool, default=False
+            If True, request the parcels within the bounding box of the points with
+            a paged BBOX filter instead of per point intersection filters. If the
+            bounding box holds MAX_BBOX_FEATURES parcels or more, e.g. for points
+            far apart, the per point filters are used instead.
+
+        Returns
+        -------
+        gpd.GeoDataFrame or None
+            One parcel per point that intersects a parcel, indexed by the position
+            of the point in the input arrays. None if no parcels are found.
+        """
+        source_crs = self.get_layer_crs(parcel_type, year)
+        points = self.points_in_source_crs_from_lat_lon(lats, lons, source_crs)
+        if len(points) == 0:
+            return None
+        coords = shapely.get_coordinates(points)
+        results = None
+        if use_bbox:
+            geom_property = self._properties_by_type[parcel_type].geometry
+            minx, miny = coords.min(axis=0)
+            maxx, maxy = coords.max(axis=0)
+            gdf = self.query(
+                f"BBOX({geom_property},{minx},{miny},{maxx},{maxy})",
+                year,
+                parcel_type,
+                assume_year_valid=True,
+                max_features=MAX_BBOX_FEATURES,
+            )
+            if gdf is not None and len(gdf) >= MAX_BBOX_FEATURES:
+                # The result may be truncated, points would be silently dropped
+                logger.info(
+                    "Bounding box of the points holds too many parcels, "
+                    "querying the parcels per point."
+                )
+            else:
+                results = [gdf] if gdf is not None else []
+        if results is None:
+            filters = [
+                " OR ".join(
+                    self._intersects_filter(x, y, parcel_type, source_crs)
+                    for x, y in coords[start : start + MAX_POINTS_PER_QUERY]
+                )
+                for start in range(0, len(coords), MAX_POINTS_PER_QUERY)
+            ]
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_CONCURRENT_REQUESTS, len(filters))
+            ) as executor:
+                results = [
+                    gdf
+                    for gdf in executor.map(
+                        # The year was checked when resolving the layer CRS
+                        lambda query_filter: self.query(
+                            query_filter, year, parcel_type, assume_year_valid=True
+                        ),
+                        filters,
+                    )
+                    if gdf is not None
+                ]
+        if not results:
+            return None
+        gdf = pd.concat(results, ignore_index=True) if len(results) > 1 else results[0]
+
+        # Match the points to the returned parcels, first parcel per point as in
+        # get_parcel_by_point
+        point_idx, parcel_idx = gdf.sindex.query(points, predicate="intersects")
+        order = np.lexsort((parcel_idx, point_idx))
+        point_idx, first = np.unique(point_idx[order], return_index=True)
+        gdf = gdf.take(parcel_idx[order][first])
+        gdf.index = pd.Index(point_idx)
+        return self.handle_output(
+            gdf, year, to_series=False, output_crs=output_crs, parcel_type=parcel_type
+        )
+
+    def _intersects_filter(
+        self, x: float, y: float, parcel_type: ParcelType, source_crs: CRS
+    ) -> str:
+        # CQL filter for parcels intersecting a point in the layer CRS. Rounded
+        # coordinates keep the URLs short and identical for nearby points.
+        geom_property = self._properties_by_type[parcel_type].geometry
+        precision = self.coord_precision
+        if precision is None:
+            precision = 7 if source_crs.is_geographic else 3
+        return (
+            f"Intersects({geom_property},POINT ({x:.{precision}f} {y:.{precision}f}))"
+        )
+
+    def _xy_from_lat_lon(
+        self, lat: float, lon: float, parcel_type: ParcelType, year: int
+    ) -> tuple[float, float, CRS]:
+        # Transforms the coordinates without creating a Point, the layer CRS and
+        # the transformer are cached. Also checks that the year is available.
+        source_crs = self.get_layer_crs(parcel_type, year)
+        x, y = _get_transformer_from_wgs84(source_crs).transform(lat, lon)
+        if not (np.isfinite(x) and np.isfinite(y)):
+            err_msg = f"Invalid coordinates after transformation: {x}, {y}"
+            logger.error(err_msg)
+            raise ValueError(err_msg)
+        return x, y, source_crs
 
     @staticmethod
     def point_in_source_crs_from_lat_lon(
@@ -569,7 +1492,7 @@ class ParcelWFS(BaseModel):
         Point
             Point geometry in the target CRS.
         """
-        transformer_to_source_crs = Transformer.from_crs("epsg:4326", source_crs)
+        transformer_to_source_crs = _get_transformer_from_wgs84(source_crs)
         x, y = transformer_to_source_crs.transform(lat, lon)
         # Check if coordinates are not NaN or infinite
         if np.isnan(x) or np.isnan(y) or np.isinf(x) or np.isinf(y):
@@ -579,6 +1502,47 @@ class ParcelWFS(BaseModel):
         point = Point(x, y)
         return point
 
+    @staticmethod
+    def points_in_source_crs_from_lat_lon(
+        lats: np.ndarray, lons: np.ndarray, source_crs: CRS
+    ) -> np.ndarray:
+        """
+        Transform arrays of lat/lon coordinates to points in the source CRS.
+
+        Parameters
+        ----------
+        lats : np.ndarray
+            Latitudes in WGS84 (EPSG:4326).
+        lons : np.ndarray
+            Longitudes in WGS84 (EPSG:4326).
+        source_crs : CRS
+            Target coordinate reference system.
+
+        Returns
+        -------
+        np.ndarray
+            Array of Point geometries in the target CRS.
+
+        Raises
+        ------
+        ValueError
+            If any of the transformed coordinates is not finite.
+        """
+        transformer_to_source_crs = _get_transformer_from_wgs84(source_crs)
+        x, y = transformer_to_source_crs.transform(
+            np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+        )
+        # Check if coordinates are not NaN or infinite
+        is_invalid = ~(np.isfinite(x) & np.isfinite(y))
+        if is_invalid.any():
+            err_msg = (
+                "Invalid coordinates after transformation at positions: "
+                f"{np.flatnonzero(is_invalid).tolist()}"
+            )
+            logger.error(err_msg)
+            raise ValueError(err_msg)
+        return shapely.points(x, y)
+
     def get_layer_crs(self, parcel_type: ParcelType, year: int):
         """
         Get the coordinate reference system for a WFS layer.
@@ -600,20 +1564,12 @@ class ParcelWFS(BaseModel):
         ValueError
             If the layer for the given year is not available.
         """
-        years_available = self.get_available_parcel_years(parcel_type)
-        if year not in years_available:
-            raise ValueError(
-                f"""Field parcel layer not available for year {year}. Currently
-                            available years: {years_available}"""
-            )
-        layer_name = f"{getattr(self.layers, parcel_type.value)}{year}"
+        self.check_year_available(year, parcel_type)
+        layer_name = f"{self._layer_by_type[parcel_type]}{year}"
 
-        wfs = WebFeatureService(
-            url=getattr(self.endpoints, parcel_type.value), version=self.wfs_version
+        return _get_layer_crs(
+            self._endpoint_by_type[parcel_type], self.wfs_version, layer_name
         )
-        layer_crs = wfs.contents[layer_name].crsOptions[0]
-        crs = CRS.from_user_input(layer_crs.id)
-        return crs
 
     def get_gsaa_parcel_by_lat_lon(
         self, lat: float, lon: float, year: int, output_crs: CRS | None = None
@@ -637,11 +1593,10 @@ class ParcelWFS(BaseModel):
         pd.Series
             Series containing the GSAA parcel data and geometry at the given location.
         """
-        source_crs = self.get_layer_crs(ParcelType.GSAA, year)
-        point = self.point_in_source_crs_from_lat_lon(lat, lon, source_crs=source_crs)
-
-        parcel = self.get_parcel_by_point(point, year, ParcelType.GSAA, output_crs)
-        return parcel
+        x, y, source_crs = self._xy_from_lat_lon(lat, lon, ParcelType.GSAA, year)
+        return self._get_parcel_by_xy(
+            x, y, source_crs, year, ParcelType.GSAA, output_crs=output_crs
+        )
 
     def get_lpis_parcel_by_id(
         self, lpis_parcel_id: str, year: int, output_crs: CRS | None = None
@@ -666,8 +1621,16 @@ class ParcelWFS(BaseModel):
         # Need to single quote the parcel id, otherwise won't work with parcel IDs starting with 0
         query_filter = f"{self.lpis_properties.lpis_parcel_id}='{lpis_parcel_id}'"
         # Read data from URL
-        gdf = self.query(query_filter, year, ParcelType.LPIS)
-        return self.handle_output(gdf, year, to_series=True, output_crs=output_crs)
+        gdf = self.query(
+            query_filter, year, ParcelType.LPIS, output_crs, max_features=1
+        )
+        return self.handle_output(
+            gdf,
+            year,
+            to_series=True,
+            output_crs=output_crs,
+            parcel_type=ParcelType.LPIS,
+        )
 
     def get_lpis_parcel_by_lat_lon(
         self, lat: float, lon: float, year: int, output_crs: CRS | None = None
@@ -691,39 +1654,48 @@ class ParcelWFS(BaseModel):
         pd.Series
             Series containing the LPIS parcel data and geometry at the given location.
         """
-        source_crs = self.get_layer_crs(ParcelType.LPIS, year)
-        point = self.point_in_source_crs_from_lat_lon(lat, lon, source_crs=source_crs)
-        parcel = self.get_parcel_by_point(point, year, ParcelType.LPIS, output_crs)
-        return parcel
+        x, y, source_crs = self._xy_from_lat_lon(lat, lon, ParcelType.LPIS, year)
+        return self._get_parcel_by_xy(
+            x, y, source_crs, year, ParcelType.LPIS, output_crs=output_crs
+        )
 
     def handle_year_input(
-        self, year: int | list[int] | None, parcel_type: ParcelType
+        self, year: int | Iterable[int] | None, parcel_type: ParcelType
     ) -> list[int]:
         """
         Convert year input to a list of years.
 
         Parameters
         ----------
-        year : int, list[int], or None
-            Year(s) to process. If None, returns all available years.
+        year : int, iterable of int, or None
+            Year(s) to process, e.g. a list, tuple or range. If None, returns all
+            available years.
         parcel_type : ParcelType
             Type of parcel to get available years for.
 
         Returns
         -------
         list[int]
-            List of years to query.
+            List of years to query. Empty if no years are available.
+
+        Raises
+        ------
+        TypeError
+            If year is not an integer, an iterable of integers or None.
         """
         if year is None:
-            years = self.get_available_parcel_years(parcel_type)
-        elif isinstance(year, int):
-            years = [year]
-        elif isinstance(year, list):
-            years = year
-        return years
+            # Available years are cached, see get_wfs_contents
+            return self.get_available_parcel_years(parcel_type) or []
+        if isinstance(year, (int, np.integer)):
+            return [int(year)]
+        if isinstance(year, Iterable) and not isinstance(year, (str, bytes)):
+            return [int(y) for y in year]
+        err_msg = f"Year must be an integer, an iterable of integers or None: {year!r}"
+        logger.error(err_msg)
+        raise TypeError(err_msg)
 
     def get_gsaa_parcel_species_by_lat_lon(
-        self, lat: float, lon: float, year: int | list[int] | None = None
+        self, lat: float, lon: float, year: int | Iterable[int] | None = None
     ) -> dict:
         """
         Get species information for GSAA parcels at a given location.
@@ -734,23 +1706,63 @@ class ParcelWFS(BaseModel):
             Latitude in WGS84 (EPSG:4326).
         lon : float
             Longitude in WGS84 (EPSG:4326).
-        year : int, list[int], or None, optional
+        year : int, iterable of int, or None, optional
             Year(s) to query. If None, queries all available years.
 
         Returns
         -------
         dict
-            Dictionary mapping years to species information dictionaries.
+            Dictionary mapping years to species information dictionaries. Years
+            without a parcel at the location or with a failed query are omitted.
+
+        Raises
+        ------
+        ValueError
+            If a requested year is not available or the coordinates are invalid.
         """
         years = self.handle_year_input(year, ParcelType.GSAA)
+        if not years:
+            return {}
+
+        # Only the attributes used in the species information are requested
+        properties = [
+            self.gsaa_properties.lpis_parcel_id,
+            self.gsaa_properties.gsaa_parcel_name,
+            self.gsaa_properties.species_code,
+            self.gsaa_properties.species_description,
+        ]
 
-        species_information = {}
-        for year in years:
-            parcel = self.get_gsaa_parcel_by_lat_lon(lat, lon, year)
-            if parcel is not None:
-                species_information[year] = self.species_information_from_gsaa_parcel(
-                    parcel
+        def get_species_information(year: int) -> dict | None:
+            x, y, source_crs = self._xy_from_lat_lon(lat, lon, ParcelType.GSAA, year)
+            try:
+                parcel = self._get_parcel_by_xy(
+                    x,
+                    y,
+                    source_crs,
+                    year,
+                    ParcelType.GSAA,
+                    properties=properties,
+                    skip_geometry=True,
                 )
+            except Exception as err:
+                # A failing layer does not abort the lookups for the other years
+                logger.error(f"Querying GSAA parcels for year {year} failed: {err}")
+                return None
+            if parcel is None:
+                return None
+            return self.species_information_from_gsaa_parcel(parcel)
+
+        # Requests for different years are independent and IO-bound, parsing the
+        # responses also happens in the worker threads
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_CONCURRENT_REQUESTS, len(years))
+        ) as executor:
+            species_per_year = executor.map(get_species_information, years)
+
+        species_information = {}
+        for year, species in zip(years, species_per_year):
+            if species is not None:
+                species_information[year] = species
 
         return species_information
 
@@ -773,19 +1785,15 @@ class ParcelWFS(BaseModel):
             Dictionary containing species information, or None if parcel not found.
         """
 
+        # The year property is already set by handle_output
         parcel = self.get_gsaa_parcel_by_id(gsaa_parcel_id, year)
-
-        if self.gsaa_properties.year not in parcel:
-            parcel[self.gsaa_properties.year] = year
-
-        if parcel is not None:
-            return self.species_information_from_gsaa_parcel(parcel)
-        else:
+        if parcel is None:
             logger.error(
                 f"No field parcel with given query parameters: {gsaa_parcel_id}."
                 f" Please check the parcel ID format."
             )
             return None
+        return self.species_information_from_gsaa_parcel(parcel)
 
     def species_information_from_gsaa_parcel(self, gsaa_parcel: pd.Series) -> dict:
         """
@@ -838,28 +1846,53 @@ class ParcelWFS(BaseModel):
             Dictionary with lpis_parcel_id, species_code, species_description,
             and total area for the dominant species, or None if no parcels found.
         """
-        gsaa_parcels = self.get_gsaa_parcels_by_lpis_parcel_id(lpis_parcel_id, year)
+        gsaa_parcels = self.get_gsaa_parcels_by_lpis_parcel_id(
+            lpis_parcel_id,
+            year,
+            properties=[
+                self.gsaa_properties.lpis_parcel_id,
+                self.gsaa_properties.species_code,
+                self.gsaa_properties.species_description,
+                self.gsaa_properties.area,
+            ],
+            # Only the attributes are aggregated
+            skip_geometry=True,
+        )
         if gsaa_parcels is None:
             logger.error(
                 f"No field parcel with given query parameters: {lpis_parcel_id}."
             )
             return None
 
-        max_area_species_info = (
-            gsaa_parcels.groupby(
-                [
-                    self.gsaa_properties.species_code,
-                    self.gsaa_properties.species_description,
-                ]
-            )[[self.gsaa_properties.area]]
-            .sum()
-            .idxmax()
+        # Total area per (species code, description) pair in one pass. Species are
+        # keyed by their sorted code and description positions, so ties and missing
+        # values are resolved as with a groupby over the two columns. The columns
+        # are factorized as is, Arrow-backed strings are encoded without conversion
+        # to Python objects.
+        code_idx, unique_codes = pd.factorize(
+            gsaa_parcels[self.gsaa_properties.species_code], sort=True
+        )
+        description_idx, unique_descriptions = pd.factorize(
+            gsaa_parcels[self.gsaa_properties.species_description], sort=True
+        )
+        areas = gsaa_parcels[self.gsaa_properties.area].to_numpy(dtype=np.float64)
+        has_species = (code_idx >= 0) & (description_idx >= 0)
+        species_keys = (
+            code_idx[has_species] * len(unique_descriptions)
+            + description_idx[has_species]
+        )
+        unique_keys, species_idx = np.unique(species_keys, return_inverse=True)
+        total_areas = np.bincount(
+            species_idx, weights=np.nan_to_num(areas[has_species])
+        )
+        max_area_code_idx, max_area_description_idx = divmod(
+            unique_keys[total_areas.argmax()], len(unique_descriptions)
         )
         parcel_id = f"{year}{PARCEL_SEP}{lpis_parcel_id}"
         species_information = {
             "parcel_id": parcel_id,
             "lpis_parcel_id": lpis_parcel_id,
-            "species_code_FI": max_area_species_info.iloc[0][0],
-            "species_description_FI": max_area_species_info.iloc[0][1],
+            "species_code_FI": unique_codes[max_area_code_idx],
+            "species_description_FI": unique_descriptions[max_area_description_idx],
         }
         return species_information
@@ -1,4 +1,16 @@
-from parcelwfs.parcels import Parcel, PARCEL_SEP
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from parcelwfs.parcels import (
+    Parcel,
+    PARCEL_SEP,
+    MergingCriteria,
+    merge_by_longest_intersection,
+    merge_by_shortest_boundary,
+    merge_geometries,
+    replace_geometries,
+)
 
 qvidja_ec_reference_parcel_id = "5730455963"
 qvidja_ec_parcel_id = f"2022/{qvidja_ec_reference_parcel_id}"
@@ -47,3 +59,80 @@ class TestParcel:
         )
         assert ref_parcel == qvidja_ec_reference_parcel_id
         assert len(agri_parcels) == 2
+
+    def test_merge_by_shortest_boundary(self):
+        targets = gpd.GeoDataFrame(
+            geometry=[box(0, 0, 10, 10), box(20, 0, 40, 5), box(50, 50, 60, 60)],
+            crs=3067,
+        )
+        candidate = pd.Series({"geometry": box(10, 0, 20, 10)})
+        merged = merge_by_shortest_boundary(candidate, targets)
+        # Merging with the first target gives a 20 x 10 rectangle (perimeter 60)
+        assert merged.geometry[0].equals(box(0, 0, 20, 10))
+        assert merged.geometry.area.tolist() == [200, 100, 100]
+        assert targets.geometry.area.tolist() == [100, 100, 100]
+
+        # Corner contact only would give a MultiPolygon
+        corner = pd.Series({"geometry": box(60, 60, 70, 70)})
+        assert merge_by_shortest_boundary(corner, targets.iloc[[2]]) is None
+
+    def test_merge_by_longest_intersection(self):
+        targets = gpd.GeoDataFrame(
+            geometry=[box(0, 0, 10, 10), box(10, 0, 20, 5), box(50, 50, 60, 60)],
+            crs=3067,
+        )
+        candidate = pd.Series({"geometry": box(10, 5, 20, 10)})
+        merged = merge_by_longest_intersection(candidate, targets)
+        # Candidate shares a 5 m edge with the first and a 10 m edge with the second
+        assert merged.geometry.area.tolist() == [100, 100, 100]
+        assert merged.geometry[1].equals(box(10, 0, 20, 10))
+        assert targets.geometry.area.tolist() == [100, 50, 100]
+
+        not_adjacent = pd.Series({"geometry": box(100, 100, 110, 110)})
+        assert merge_by_longest_intersection(not_adjacent, targets) is None
+
+    def test_replace_geometries(self):
+        gdf = gpd.GeoDataFrame(
+            {"a": [1, 2]}, geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)], crs=3067
+        ).rename_geometry("geom")
+        updated = replace_geometries(gdf, np.array([1]), np.array([box(1, 0, 3, 1)]))
+        assert updated.columns.tolist() == ["a", "geom"]
+        assert updated.geometry.name == "geom"
+        assert updated.geometry.area.tolist() == [1, 2]
+        assert gdf.geometry.area.tolist() == [1, 1]
+
+    def test_merge_geometries_by_longest_intersection(self):
+        gdf = gpd.GeoDataFrame(
+            geometry=[
+                box(0, 0, 100, 100),
+                box(100, 0, 110, 100),
+                box(0, 100, 100, 200),
+            ],
+            crs=3067,
+        )
+        merged = merge_geometries(
+            gdf,
+            min_width=20,
+            merging_criteria=MergingCriteria.LONGEST_INTERSECTION,
+        )
+        assert len(merged) == 2
+        assert merged.geometry.area.sum() == gdf.geometry.area.sum()
+
+    def test_get_parcels_from_wfs_gdf(self):
+        gdf = gpd.GeoDataFrame(
+            {
+                "parcel_id": [
+                    PARCEL_SEP.join(["2022", qvidja_ec_reference_parcel_id, "1"]),
+                    PARCEL_SEP.join(["2022", qvidja_ec_reference_parcel_id, "2"]),
+                ],
+                "other": [1, 2],
+            },
+            geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)],
+            crs=3067,
+        )
+        wfs = Parcel.validate_parcelwfs_input(parcelwfs_id, None)
+        parcels = Parcel.get_parcels_from_wfs_gdf(gdf, wfs)
+        assert [parcel.parcel_id for parcel in parcels] == gdf["parcel_id"].tolist()
+        assert all(parcel.wfs is wfs for parcel in parcels)
+        assert parcels[1].gsaa_parcel_names == ["2"]
+        assert parcels[1].geometry.equals(box(10, 0, 20, 10))
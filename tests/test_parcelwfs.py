@@ -1,7 +1,17 @@
+import json
+import os
+import re
+import time
+
 import pandas as pd
+import numpy as np
 import geopandas as gpd
-from shapely.geometry import Polygon
+import requests
+from pyproj import CRS, Transformer
+from shapely.geometry import MultiPoint, Point, Polygon, box, mapping
 import parcelwfs
+import parcelwfs.parcelwfs as wfs_module
+from parcelwfs.parcelwfs import _read_geojson
 
 
 fi_country = "FI"
@@ -73,6 +83,35 @@ class TestParcelWFS:
             assert isinstance(pwfs, parcelwfs.ParcelWFS)
             assert pwfs.id == parcelwfs_id
 
+    def test_handle_output_adds_year(self):
+        gdf = gpd.GeoDataFrame({"a": [1]}, geometry=[Polygon()], crs=25832)
+        wfs = parcelwfs.ParcelWFS.get_by_id(dk_code)
+        for parcel_type, properties in [
+            (parcelwfs.ParcelType.GSAA, wfs.gsaa_properties),
+            (parcelwfs.ParcelType.LPIS, wfs.lpis_properties),
+        ]:
+            output = wfs.handle_output(gdf.copy(), dk_year, False, None, parcel_type)
+            assert properties.year == "year"
+            assert output.columns.tolist() == ["a", "geometry", "year"]
+            assert output["year"].tolist() == [dk_year]
+
+    def test_read_geojson_without_geometry(self):
+        features = [
+            {"type": "Feature", "id": "a.1", "geometry": None, "properties": p}
+            for p in [{"b": "ä"}, {"id": 5, "b": "x"}]
+        ]
+        for feature in features:
+            content = json.dumps(
+                {"type": "FeatureCollection", "features": [feature]},
+                ensure_ascii=False,
+            ).encode()
+            df = _read_geojson(content, read_geometry=False)
+            assert not isinstance(df, gpd.GeoDataFrame)
+            # Same columns as reading the response with OGR
+            assert df.columns.tolist() == ["id", "b"]
+            assert df["id"].iloc[0] == feature["properties"].get("id", "a.1")
+            assert df["b"].iloc[0] == feature["properties"]["b"]
+
     def test_get_gsaa_parcels_by_lpis_parcel_id(self):
         for country in self.test_countries:
             wfs = parcelwfs.ParcelWFS.get_by_id(country)
@@ -97,6 +136,19 @@ class TestParcelWFS:
                 == test_data[country]["lpis_parcel_id"]
             )
 
+    def test_get_gsaa_parcels_by_ids(self):
+        for country in self.test_countries:
+            wfs = parcelwfs.ParcelWFS.get_by_id(country)
+            gsaa_parcels = wfs.get_gsaa_parcels_by_ids(
+                [test_data[country]["gsaa_parcel_id"]], test_data[country]["year"]
+            )
+            assert isinstance(gsaa_parcels, gpd.GeoDataFrame)
+            assert len(gsaa_parcels) == 1
+            assert (
+                gsaa_parcels[wfs.gsaa_properties.lpis_parcel_id].iloc[0]
+                == test_data[country]["lpis_parcel_id"]
+            )
+
     def test_get_parcel_by_lat_lon(self):
         for country in self.test_countries:
             wfs = parcelwfs.ParcelWFS.get_by_id(country)
@@ -111,6 +163,22 @@ class TestParcelWFS:
                 == test_data[country]["lpis_parcel_id"]
             )
 
+    def test_get_parcels_by_points(self):
+        for country in self.test_countries:
+            wfs = parcelwfs.ParcelWFS.get_by_id(country)
+            parcels = wfs.get_parcels_by_points(
+                np.array([test_data[country]["lat"], 0.0]),
+                np.array([test_data[country]["lon"], 0.0]),
+                test_data[country]["year"],
+                parcelwfs.ParcelType.GSAA,
+            )
+            assert isinstance(parcels, gpd.GeoDataFrame)
+            assert parcels.index.tolist() == [0]
+            assert (
+                parcels.loc[0, wfs.gsaa_properties.lpis_parcel_id]
+                == test_data[country]["lpis_parcel_id"]
+            )
+
     def test_get_parcel_species_by_lat_lon(self):
         for country in self.test_countries:
             wfs = parcelwfs.ParcelWFS.get_by_id(country)
@@ -162,6 +230,19 @@ class TestParcelWFS:
                 == test_data[country]["lpis_parcel_id"]
             )
 
+    def test_get_lpis_parcels_by_ids(self):
+        for country in self.test_countries:
+            wfs = parcelwfs.ParcelWFS.get_by_id(country)
+            lpis_parcels = wfs.get_lpis_parcels_by_ids(
+                [test_data[country]["lpis_parcel_id"]], test_data[country]["year"]
+            )
+            assert isinstance(lpis_parcels, gpd.GeoDataFrame)
+            assert len(lpis_parcels) == 1
+            assert (
+                lpis_parcels[wfs.lpis_properties.lpis_parcel_id].iloc[0]
+                == test_data[country]["lpis_parcel_id"]
+            )
+
     def test_get_lpis_parcel_by_lat_lon(self):
         for country in self.test_countries:
             wfs = parcelwfs.ParcelWFS.get_by_id(country)
@@ -187,3 +268,264 @@ class TestParcelWFS:
                 species_information["lpis_parcel_id"]
                 == test_data[country]["lpis_parcel_id"]
             )
+
+
+class FakeWFS:
+    """Serves GetFeature requests of the shared session from a list of boxes."""
+
+    def __init__(self, n_features):
+        self.geometries = [box(10 * i, 0, 10 * i + 10, 10) for i in range(n_features)]
+        self.requests = []
+        self.posted = []
+
+    def matching(self, query_filter):
+        # Positions of the features selected by the filters used by ParcelWFS
+        if query_filter == "empty":
+            return []
+        points = re.findall(r"POINT \(([-\d.]+) ([-\d.]+)\)", query_filter)
+        bbox = re.search(r"BBOX\(\w+,([^)]*)\)", query_filter)
+        ids = re.findall(r"PERUSLOHKOTUNNUS='([^']*)'", query_filter)
+        for id_list in re.findall(r"PERUSLOHKOTUNNUS IN \(([^)]*)\)", query_filter):
+            ids += re.findall(r"'([^']*)'", id_list)
+        if points:
+            geometry = MultiPoint([(float(x), float(y)) for x, y in points])
+        elif bbox:
+            geometry = box(*map(float, bbox.group(1).split(",")))
+        elif ids:
+            return [int(i) for i in ids if int(i) < len(self.geometries)]
+        else:
+            return list(range(len(self.geometries)))
+        return [i for i, g in enumerate(self.geometries) if g.intersects(geometry)]
+
+    def post(self, url, data, timeout):
+        self.posted.append(data)
+        return self.get(url, data, timeout)
+
+    def get(self, url, params, timeout):
+        self.requests.append(params)
+        matching = self.matching(params["cql_filter"])
+        start = int(params.get("startIndex", 0))
+        stop = start + int(params.get("count", len(matching)))
+        features = [
+            {
+                "type": "Feature",
+                "id": f"layer.{i}",
+                "geometry": mapping(self.geometries[i]),
+                "properties": {"PERUSLOHKOTUNNUS": str(i)},
+            }
+            for i in matching[start:stop]
+        ]
+        content = json.dumps({"type": "FeatureCollection", "features": features})
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content.encode()
+        return response
+
+
+def offline_wfs(monkeypatch, n_features, cache_dir=None):
+    parcelwfs.ParcelWFS.clear_cache()
+    fake = FakeWFS(n_features)
+    monkeypatch.setattr(wfs_module._SESSION, "get", fake.get)
+    monkeypatch.setattr(wfs_module._SESSION, "post", fake.post)
+    monkeypatch.setattr(
+        wfs_module, "_get_parcel_year_set", lambda *args: frozenset([fi_year])
+    )
+    monkeypatch.setattr(wfs_module, "_get_layer_crs", lambda *args: CRS(3067))
+    wfs = parcelwfs.ParcelWFS.get_by_id(fi_country).model_copy(
+        update={"cache_dir": cache_dir}
+    )
+    return wfs, fake
+
+
+class TestParcelWFSOffline:
+    gsaa = parcelwfs.ParcelType.GSAA
+
+    def test_query_paged(self, monkeypatch):
+        wfs, fake = offline_wfs(monkeypatch, 7)
+        endpoint = wfs.endpoints.gsaa
+        params = {"cql_filter": "all"}
+        pages = list(
+            wfs._query_paged(endpoint, params, False, 100, page_size=3, sort_by="id")
+        )
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [r.get("startIndex") for r in fake.requests] == [None, 3, 6]
+        # All pages are requested in the same order
+        assert [r.get("sortBy") for r in fake.requests] == ["id"] * 3
+        assert pd.concat(pages)["PERUSLOHKOTUNNUS"].tolist() == list("0123456")
+
+        # Paging stops at max_features
+        fake.requests.clear()
+        gdf = wfs.query("all", fi_year, self.gsaa, max_features=2)
+        assert gdf["PERUSLOHKOTUNNUS"].tolist() == ["0", "1"]
+        assert [r["count"] for r in fake.requests] == [2]
+        # A single page needs no sorting
+        assert "sortBy" not in fake.requests[0]
+
+    def test_response_cache(self, monkeypatch, tmp_path):
+        wfs, fake = offline_wfs(monkeypatch, 2, cache_dir=tmp_path)
+        first = wfs.query("all", fi_year, self.gsaa)
+        second = wfs.query("all", fi_year, self.gsaa)
+        assert len(fake.requests) == 1
+        assert second.equals(first)
+        assert len(list((tmp_path / "responses").glob("*.json"))) == 1
+
+        # Empty results are requested again
+        assert wfs.query("empty", fi_year, self.gsaa) is None
+        assert wfs.query("empty", fi_year, self.gsaa) is None
+        assert len(fake.requests) == 3
+        assert len(list((tmp_path / "responses").glob("*.json"))) == 1
+
+        wfs.clear_response_cache()
+        assert not list((tmp_path / "responses").glob("*.json"))
+        wfs.query("all", fi_year, self.gsaa)
+        assert len(fake.requests) == 4
+
+    def test_memory_cache(self, monkeypatch):
+        wfs, fake = offline_wfs(monkeypatch, 3)
+        first = wfs.get_gsaa_parcels_by_lpis_parcel_id("1", fi_year)
+        second = wfs.get_gsaa_parcels_by_lpis_parcel_id("1", fi_year)
+        assert len(fake.requests) == 1
+        assert second.equals(first)
+        # Every call parses its own frame
+        first["PERUSLOHKOTUNNUS"] = "changed"
+        assert second["PERUSLOHKOTUNNUS"].tolist() == ["1"]
+
+        parcel = wfs.get_parcel_by_point(Point(5, 5), fi_year, self.gsaa)
+        assert parcel["PERUSLOHKOTUNNUS"] == "0"
+        wfs.get_parcel_by_point(Point(5, 5), fi_year, self.gsaa)
+        assert len(fake.requests) == 2
+
+        # Points without a parcel are requested again
+        for _ in range(3):
+            assert wfs.get_parcel_by_point(Point(5, 50), fi_year, self.gsaa) is None
+        assert len(fake.requests) == 5
+
+        wfs.clear_response_cache()
+        wfs.get_gsaa_parcels_by_lpis_parcel_id("1", fi_year)
+        assert len(fake.requests) == 6
+
+    def test_memory_cache_size(self):
+        cache = wfs_module._ResponseCache(max_bytes=10, max_item_bytes=6)
+        cache.put("a", 0, b"aaaa")
+        cache.put("b", 0, b"bbbb")
+        cache.put("large", 0, b"x" * 7)
+        assert cache.get("large", 0) is None
+        assert cache.get("a", 0) == b"aaaa"
+        # The least recently used response is dropped to stay within max_bytes
+        cache.put("c", 0, b"cccc")
+        assert cache.get("b", 0) is None
+        assert cache.get("a", 0) == b"aaaa"
+        # Responses expire with the TTL key
+        assert cache.get("c", 1) is None
+        assert cache.get("c", 0) is None
+
+    def test_get_parcels_by_ids_in_chunks(self, monkeypatch):
+        n_ids = 2 * wfs_module.MAX_IDS_PER_QUERY + 1
+        wfs, fake = offline_wfs(monkeypatch, n_ids)
+        year_checks = []
+
+        def get_parcel_year_set(*args):
+            year_checks.append(args)
+            return frozenset([fi_year])
+
+        monkeypatch.setattr(wfs_module, "_get_parcel_year_set", get_parcel_year_set)
+        ids = [str(i) for i in range(n_ids)]
+        for get_parcels, parcel_ids in [
+            (wfs.get_gsaa_parcels_by_ids, [f"{i}_1" for i in ids]),
+            (wfs.get_lpis_parcels_by_ids, ids),
+        ]:
+            fake.requests.clear()
+            year_checks.clear()
+            parcels = get_parcels(parcel_ids, fi_year)
+            assert len(fake.requests) == 3
+            assert len(year_checks) == 1
+            # Results of all chunks are concatenated
+            assert sorted(parcels["PERUSLOHKOTUNNUS"], key=int) == ids
+            assert parcels.index.tolist() == list(range(n_ids))
+            assert (parcels["VUOSI"] == fi_year).all()
+
+    def test_long_filter_is_posted(self, monkeypatch):
+        wfs, fake = offline_wfs(monkeypatch, 3)
+        short_filter = "PERUSLOHKOTUNNUS IN ('0','2')"
+        long_filter = (
+            "PERUSLOHKOTUNNUS IN ("
+            + ",".join(f"'{i}'" for i in [0, 2, *range(10, 1000)])
+            + ")"
+        )
+        assert len(long_filter) > wfs_module.MAX_URL_LENGTH
+        expected = wfs.query(short_filter, fi_year, self.gsaa)
+        assert not fake.posted
+        gdf = wfs.query(long_filter, fi_year, self.gsaa)
+        assert len(fake.posted) == 1
+        # Same KVP parameters as a GET request
+        assert fake.posted[0] == {**fake.requests[0], "cql_filter": long_filter}
+        assert gdf.equals(expected)
+
+    def test_get_parcels_by_points_use_bbox(self, monkeypatch):
+        wfs, fake = offline_wfs(monkeypatch, 4)
+        # Points in the first and the third parcel, and one outside the parcels
+        x, y = np.array([5, 25, 25]), np.array([5, 5, 50])
+        lons, lats = Transformer.from_crs(3067, 4326, always_xy=True).transform(x, y)
+        for max_bbox_features, n_bbox_requests in [(100, 1), (2, 1)]:
+            monkeypatch.setattr(wfs_module, "MAX_BBOX_FEATURES", max_bbox_features)
+            wfs.clear_response_cache()
+            fake.requests.clear()
+            parcels = wfs.get_parcels_by_points(
+                np.asarray(lats), np.asarray(lons), fi_year, self.gsaa, use_bbox=True
+            )
+            assert parcels.index.tolist() == [0, 1]
+            assert parcels["PERUSLOHKOTUNNUS"].tolist() == ["0", "2"]
+            filters = [r["cql_filter"] for r in fake.requests]
+            assert sum(f.startswith("BBOX") for f in filters) == n_bbox_requests
+            # Too many parcels in the bounding box fall back to per point filters
+            assert any("POINT" in f for f in filters) == (max_bbox_features == 2)
+
+    def test_prefetch(self, monkeypatch, tmp_path):
+        wfs, fake = offline_wfs(monkeypatch, 3, cache_dir=tmp_path)
+        path = wfs.prefetch((0, 0, 30, 10), fi_year, self.gsaa)
+        assert path.exists()
+        assert path.suffix == ".fgb"
+        # The downloaded parcels are not stored again as a response
+        assert not (tmp_path / "responses").exists()
+
+        # Points within the prefetched bounding box are looked up from the file
+        n_requests = len(fake.requests)
+        parcel = wfs.get_parcel_by_point(Point(25, 5), fi_year, self.gsaa)
+        assert parcel["PERUSLOHKOTUNNUS"] == "2"
+        assert parcel.geometry.equals(box(20, 0, 30, 10))
+        parcel = wfs.get_parcel_by_point(
+            Point(5, 5), fi_year, self.gsaa, skip_geometry=True
+        )
+        assert parcel["PERUSLOHKOTUNNUS"] == "0"
+        assert "geometry" not in parcel.index
+        assert len(fake.requests) == n_requests
+
+        # Other points are queried from the WFS
+        wfs.get_parcel_by_point(Point(35, 5), fi_year, self.gsaa)
+        assert len(fake.requests) == n_requests + 1
+
+        # Outdated downloads are not used
+        modified = time.time() - wfs_module.RESPONSE_CACHE_MAX_AGE - 1
+        os.utime(path, (modified, modified))
+        wfs.get_parcel_by_point(Point(25, 5), fi_year, self.gsaa)
+        assert len(fake.requests) == n_requests + 2
+
+        wfs.clear_prefetched_parcels()
+        assert not path.exists()
+
+    def test_get_available_parcel_layers(self, monkeypatch):
+        wfs, _ = offline_wfs(monkeypatch, 1)
+        base = wfs._layer_by_type[self.gsaa]
+        contents = {
+            f"{base}2021": None,
+            f"{base}2022": None,
+            f"{base}2021_view": None,
+            f"other_{base}2021": None,
+        }
+        monkeypatch.setattr(
+            wfs_module, "_get_wfs_contents", lambda *args, **kwargs: contents
+        )
+        layers = wfs.get_available_parcel_layers(self.gsaa)
+        assert layers == [f"{base}2021", f"{base}2022"]
+        years = wfs_module._get_parcel_years.__wrapped__("", "2.0.0", base, 0)
+        assert years == (2021, 2022)